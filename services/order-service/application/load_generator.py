@@ -0,0 +1,224 @@
+import asyncio
+import collections
+import math
+import os
+import random
+from typing import Optional
+from domain.entities import Order
+
+class LatencyHistogram:
+    """Latencies in log-linear buckets (HDR-style), within 1% of the recorded value.
+    
+    Microsecond values below 2**SUB_BUCKET_BITS get a bucket each; above
+    that, every power of two is split into 2**(SUB_BUCKET_BITS - 1)
+    buckets. Memory is bounded by the number of buckets, not of samples.
+    """
+    
+    SUB_BUCKET_BITS = 8
+    
+    def __init__(self):
+        self.counts: collections.Counter[int] = collections.Counter()
+        self.count = 0
+        self.max = 0.0
+    
+    def record(self, seconds: float) -> None:
+        micros = max(0, int(seconds * 1e6))
+        shift = max(0, micros.bit_length() - self.SUB_BUCKET_BITS)
+        self.counts[(shift << self.SUB_BUCKET_BITS) + (micros >> shift)] += 1
+        self.count += 1
+        self.max = max(self.max, seconds)
+    
+    def merge(self, other: 'LatencyHistogram') -> None:
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.max = max(self.max, other.max)
+    
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile in seconds: the upper edge of its bucket, capped at the max"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                shift, sub_bucket = divmod(bucket, 1 << self.SUB_BUCKET_BITS)
+                return min(self.max, (((sub_bucket + 1) << shift) - 1) / 1e6)
+        return self.max
+
+class LoadProfile:
+    """Open-loop arrival schedule: base rate with optional ramp-up and periodic bursts"""
+    
+    ARRIVALS = ('constant', 'poisson')
+    
+    def __init__(self, rate: float, duration: float, arrival: str = 'poisson', ramp_seconds: float = 0,
+                 burst_rate: float = 0, burst_every: float = 0, burst_duration: float = 0,
+                 max_concurrency: int = 100):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if arrival not in self.ARRIVALS:
+            raise ValueError(f"Unknown arrival process: {arrival}")
+        self.rate = rate
+        self.duration = duration
+        self.arrival = arrival
+        self.ramp_seconds = ramp_seconds
+        self.burst_rate = burst_rate
+        self.burst_every = burst_every
+        self.burst_duration = burst_duration
+        self.max_concurrency = max_concurrency
+    
+    @classmethod
+    def from_env(cls) -> 'LoadProfile':
+        """Defaults reproduce the old generator: ~100 orders, one every 2.5s on average"""
+        return cls(
+            rate=float(os.getenv('LOAD_RATE', '0.4')),
+            duration=float(os.getenv('LOAD_DURATION_SECONDS', '250')),
+            arrival=os.getenv('LOAD_ARRIVAL', 'poisson'),
+            ramp_seconds=float(os.getenv('LOAD_RAMP_SECONDS', '0')),
+            burst_rate=float(os.getenv('LOAD_BURST_RATE', '0')),
+            burst_every=float(os.getenv('LOAD_BURST_EVERY_SECONDS', '0')),
+            burst_duration=float(os.getenv('LOAD_BURST_DURATION_SECONDS', '0')),
+            max_concurrency=int(os.getenv('LOAD_MAX_CONCURRENCY', '100'))
+        )
+    
+    def rate_at(self, elapsed: float) -> float:
+        """Target arrival rate (orders/sec) at a point in the run"""
+        if self.burst_rate and self.burst_every and elapsed % self.burst_every < self.burst_duration:
+            return self.burst_rate
+        if self.ramp_seconds and elapsed < self.ramp_seconds:
+            start_rate = min(1.0, self.rate)
+            return start_rate + (self.rate - start_rate) * elapsed / self.ramp_seconds
+        return self.rate
+    
+    def next_interval(self, elapsed: float) -> float:
+        """Gap until the next intended arrival"""
+        rate = self.rate_at(elapsed)
+        if self.arrival == 'poisson':
+            return random.expovariate(rate)
+        return 1.0 / rate
+
+class LoadGenerator:
+    """Open-loop load driver for OrderApplicationService.place_order.
+    
+    Orders are scheduled at intended times that never wait for earlier
+    orders to finish. Latency is measured from the intended time, so time
+    spent queued behind the concurrency limit or a slow dependency is counted
+    (coordinated-omission corrected). Completions reported through
+    record_completion give end-to-end latency for the whole
+    OrderPlaced -> PaymentProcessed -> OrderShipped chain; orders not
+    completed within completion_timeout are counted as lost.
+    
+    Interim reports cover the last interval and the final report the whole
+    run; latencies go into bounded histograms, not sample lists.
+    """
+    
+    def __init__(self, order_service, profile: LoadProfile, report_interval: Optional[float] = None,
+                 completion_timeout: Optional[float] = None):
+        self.order_service = order_service
+        self.profile = profile
+        self.report_interval = report_interval or float(os.getenv('LOAD_REPORT_INTERVAL_SECONDS', '10'))
+        self.completion_timeout = completion_timeout or float(os.getenv('LOAD_COMPLETION_TIMEOUT_SECONDS', '60'))
+        self.concurrency = asyncio.Semaphore(profile.max_concurrency)
+        self.tasks = set()
+        self.started_at = 0.0
+        self.interval_started_at = 0.0
+        self.scheduled = 0
+        self.errors = 0
+        self.lost = 0
+        self.interval = self._histograms()
+        self.total = self._histograms()
+        # Order ID -> (intended time, completion deadline), in deadline order
+        self.intended_at: collections.OrderedDict[str, tuple[float, float]] = collections.OrderedDict()
+    
+    @staticmethod
+    def _histograms() -> dict[str, LatencyHistogram]:
+        return {name: LatencyHistogram() for name in ('place_order', 'service time', 'end-to-end')}
+    
+    async def run(self):
+        """Drive load for the configured duration, then print the final report"""
+        loop = asyncio.get_running_loop()
+        self.started_at = self.interval_started_at = loop.time()
+        intended = self.started_at
+        reporter = asyncio.create_task(self._report_periodically())
+        
+        while intended - self.started_at < self.profile.duration:
+            delay = intended - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            task = asyncio.create_task(self._place(intended))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            self.scheduled += 1
+            intended += self.profile.next_interval(intended - self.started_at)
+        
+        if self.tasks:
+            await asyncio.gather(*self.tasks)
+        reporter.cancel()
+        self.report("final")
+    
+    async def _place(self, intended: float):
+        """Place one order, measuring from its intended start"""
+        loop = asyncio.get_running_loop()
+        async with self.concurrency:
+            started = loop.time()
+            try:
+                order = await self.order_service.place_order()
+            except Exception as e:
+                self.errors += 1
+                print(f"Load generator: place_order failed: {e!r}")
+                return
+            finished = loop.time()
+        
+        self.interval['place_order'].record(finished - intended)
+        self.interval['service time'].record(finished - started)
+        self.intended_at[order.id] = (intended, finished + self.completion_timeout)
+    
+    def record_completion(self, order: Order):
+        """Called when an order reaches a terminal status (shipped or payment failed)"""
+        entry = self.intended_at.pop(order.id, None)
+        if entry is not None:
+            self.interval['end-to-end'].record(asyncio.get_running_loop().time() - entry[0])
+    
+    def _expire(self, now: float) -> int:
+        """Forget orders past their completion deadline, counting them as lost"""
+        expired = 0
+        while self.intended_at:
+            order_id, (_, deadline) = next(iter(self.intended_at.items()))
+            if deadline > now:
+                break
+            del self.intended_at[order_id]
+            expired += 1
+        self.lost += expired
+        return expired
+    
+    async def _report_periodically(self):
+        """Print an interim report every report_interval seconds"""
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.report("interim")
+    
+    def report(self, label: str):
+        """Print rates and latency percentiles of the interval since the last report, or of the whole run"""
+        now = asyncio.get_running_loop().time()
+        lost = self._expire(now)
+        histograms, started_at = self.interval, self.interval_started_at
+        for name, histogram in histograms.items():
+            self.total[name].merge(histogram)
+        self.interval, self.interval_started_at = self._histograms(), now
+        if label == 'final':
+            histograms, started_at, lost = self.total, self.started_at, self.lost
+        
+        elapsed = max(now - started_at, 1e-9)
+        placed, completed = histograms['place_order'].count, histograms['end-to-end'].count
+        print(
+            f"Load generator ({label}): {elapsed:.0f}s, target {self.profile.rate:g}/s, "
+            f"scheduled {self.scheduled}, placed {placed} ({placed / elapsed:.1f}/s), completed {completed} "
+            f"({completed / elapsed:.1f}/s), lost {lost}, in flight {len(self.tasks)}, errors {self.errors}"
+        )
+        for name, histogram in histograms.items():
+            print(
+                f"  {name:<13} p50={histogram.percentile(50) * 1000:.1f}ms "
+                f"p90={histogram.percentile(90) * 1000:.1f}ms p99={histogram.percentile(99) * 1000:.1f}ms "
+                f"p99.9={histogram.percentile(99.9) * 1000:.1f}ms max={histogram.max * 1000:.1f}ms"
+            )
\ No newline at end of file
@@ -0,0 +1,52 @@
+import asyncio
+import os
+from typing import Optional
+from domain.interfaces import EventBus, EventOutbox
+
+class OutboxRelay:
+    """Application Layer - publishes the events placed orders wrote to the outbox.
+    
+    Entries are claimed in batches and published; a batch is removed from
+    the outbox only after the broker confirmed every event in it. A batch
+    that fails is retried as a whole, so an event may be published twice
+    but is never lost; consumers skip the repeat by event_id.
+    """
+    
+    def __init__(self, outbox: EventOutbox, event_bus: EventBus,
+                 batch_size: Optional[int] = None, retry_delay: Optional[float] = None):
+        self.outbox = outbox
+        self.event_bus = event_bus
+        self.batch_size = batch_size or int(os.getenv('OUTBOX_BATCH_SIZE', '100'))
+        self.retry_delay = retry_delay or float(os.getenv('OUTBOX_RETRY_DELAY_MS', '1000')) / 1000
+        self.relayed = 0
+    
+    async def run(self):
+        """Relay outbox entries until cancelled"""
+        batch = []
+        while True:
+            try:
+                if not batch:
+                    batch = await self.outbox.claim(self.batch_size)
+                    if not batch:
+                        continue
+                await self.relay(batch)
+            except Exception as e:
+                # Covers claim() too: a Redis outage must not end the relay
+                if batch:
+                    print(f"Order Service: Outbox relay failed, retrying {len(batch)} events: {e!r}")
+                else:
+                    print(f"Order Service: Claiming outbox entries failed, retrying: {e!r}")
+                await asyncio.sleep(self.retry_delay)
+                continue
+            batch = []
+    
+    async def relay(self, batch: list[tuple[str, str, dict, Optional[dict]]]):
+        """Publish one batch, wait for every confirm, then remove it from the outbox"""
+        # Each event continues the trace of the request that placed its order
+        confirms = [
+            await self.event_bus.publish(routing_key, event, trace_headers=trace_headers)
+            for _, routing_key, event, trace_headers in batch
+        ]
+        await asyncio.gather(*confirms)
+        await self.outbox.complete([entry_id for entry_id, *_ in batch])
+        self.relayed += len(batch)
\ No newline at end of file
@@ -0,0 +1,114 @@
+import asyncio
+import os
+from typing import Callable, Optional
+from domain.entities import Order, OrderStatus, InvalidOrderStateException
+from domain.interfaces import OrderRepository, MetricsCollector
+
+class OrderStatusProjection:
+    """Application Layer - keeps stored orders in step with payment and shipping events.
+    
+    apply_events is a batch handler for subscribe_batch. handle takes one
+    event at a time, coalescing events that arrive within a short window
+    into one batched read-modify-write. A transition that the order's current status
+    no longer allows (a redelivery, or an event overtaken by a later one) is
+    skipped, which makes the projection idempotent.
+    """
+    
+    def __init__(self, order_repository: OrderRepository, metrics: MetricsCollector,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 on_completed: Optional[Callable[[Order], None]] = None):
+        self.order_repository = order_repository
+        self.metrics = metrics
+        self.on_completed = on_completed
+        self.batch_size = batch_size or int(os.getenv('PROJECTION_BATCH_SIZE', '100'))
+        self.flush_interval = flush_interval or float(os.getenv('PROJECTION_FLUSH_INTERVAL_MS', '10')) / 1000
+        self.pending = []
+        self.flush_timer: Optional[asyncio.TimerHandle] = None
+        self.inflight_batches = set()
+    
+    async def handle(self, event: dict):
+        """Queue an event for the next batch and wait until it has been applied"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((event, future))
+        
+        if len(self.pending) >= self.batch_size:
+            self._flush()
+        elif self.flush_timer is None:
+            self.flush_timer = loop.call_later(self.flush_interval, self._flush)
+        
+        await future
+    
+    def _flush(self):
+        """Apply everything queued so far as one batch"""
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        if not self.pending:
+            return
+        
+        batch, self.pending = self.pending, []
+        task = asyncio.create_task(self._apply_batch(batch))
+        self.inflight_batches.add(task)
+        task.add_done_callback(self.inflight_batches.discard)
+    
+    async def _apply_batch(self, batch: list):
+        """Apply a batch and resolve the waiting handlers"""
+        try:
+            await self.apply_events([event for event, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+    
+    async def apply_events(self, events: list[dict]):
+        """Apply payment and shipping events in a single repository round"""
+        events_by_order = {}
+        for event in events:
+            events_by_order.setdefault(event['order_id'], []).append(event)
+        
+        def apply(order: Order) -> bool:
+            return any([self._apply_event(order, event) for event in events_by_order[order.id]])
+        
+        changed = await self.order_repository.update_many(list(events_by_order), apply)
+        
+        for order, previous_status in changed:
+            self._record_transition(order, previous_status)
+    
+    def _apply_event(self, order: Order, event: dict) -> bool:
+        """Apply one event to an order; False if its status makes it a no-op"""
+        try:
+            if event['event_type'] == 'PaymentProcessed':
+                if event['success']:
+                    order.mark_as_paid()
+                else:
+                    order.mark_payment_failed()
+            elif event['event_type'] == 'OrderShipped':
+                if order.status == OrderStatus.PLACED:
+                    # Shipping only follows a successful payment that we haven't seen yet
+                    order.mark_as_paid()
+                order.mark_as_shipped(event['tracking_number'])
+            else:
+                return False
+        except InvalidOrderStateException:
+            return False
+        return True
+    
+    def _record_transition(self, order: Order, previous_status: OrderStatus):
+        """Update order metrics for every status the order passed through"""
+        if previous_status == OrderStatus.PLACED and order.status in (OrderStatus.PAID, OrderStatus.SHIPPED):
+            self.metrics.increment_orders('paid')
+        if order.status == OrderStatus.SHIPPED:
+            self.metrics.increment_orders('shipped')
+        elif order.status == OrderStatus.PAYMENT_FAILED:
+            self.metrics.increment_orders('payment_failed')
+        
+        # Shipped and failed orders are no longer active
+        if order.status in (OrderStatus.SHIPPED, OrderStatus.PAYMENT_FAILED):
+            self.metrics.decrement_active_orders()
+            if self.on_completed:
+                self.on_completed(order)
\ No newline at end of file
@@ -1,20 +1,30 @@
 import random
 import os
+from typing import Optional
 from domain.entities import Order
 from domain.interfaces import OrderRepository, EventBus, MetricsCollector
 from domain.events import OrderPlacedEvent
 
 class OrderApplicationService:
-    """Application Layer - Order use cases"""
+    """Application Layer - Order use cases.
     
-    def __init__(self, event_bus: EventBus, metrics: MetricsCollector, order_repository: OrderRepository):
+    With the outbox on (ORDER_OUTBOX, the default) the order.placed event is
+    written together with the order and published by OutboxRelay, so placing
+    an order never waits on the broker and a crash can't lose the event.
+    """
+    
+    def __init__(self, event_bus: EventBus, metrics: MetricsCollector, order_repository: OrderRepository,
+                 use_outbox: Optional[bool] = None):
         self.event_bus = event_bus
         self.metrics = metrics
         self.order_repository = order_repository
+        if use_outbox is None:
+            use_outbox = os.getenv('ORDER_OUTBOX', 'true').lower() == 'true'
+        self.use_outbox = use_outbox
         self.min_order_value = float(os.getenv('MIN_ORDER_VALUE', '10.0'))
         self.max_order_value = float(os.getenv('MAX_ORDER_VALUE', '500.0'))
-        
-    async def place_order(self):
+    
+    async def place_order(self) -> Order:
         # Create domain object
         customer_id = f"CUST-{random.randint(1, 1000)}"
         order_value = round(random.uniform(self.min_order_value, self.max_order_value), 2)
@@ -27,13 +37,21 @@ class OrderApplicationService:
             value=order.value.amount
         )
         
-        # Save order to repository
-        await self.order_repository.save(order)
-        
-        # Publish domain event
-        self.event_bus.publish('order.placed', event.to_dict())
+        if self.use_outbox:
+            # Save order and its event atomically; the outbox relay publishes it under the trace started here
+            await self.order_repository.save_with_event(
+                order, 'order.placed', event.to_dict(), self.event_bus.current_trace_headers()
+            )
+        else:
+            # Save order to repository
+            await self.order_repository.save(order)
+            
+            # Publish domain event
+            await self.event_bus.publish('order.placed', event.to_dict())
         
         # Update metrics
         self.metrics.increment_orders('placed')
         self.metrics.record_order_value(order.value.amount)
-        self.metrics.increment_active_orders()
\ No newline at end of file
+        self.metrics.increment_active_orders()
+        
+        return order
\ No newline at end of file
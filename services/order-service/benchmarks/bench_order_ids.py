@@ -0,0 +1,41 @@
+"""Microbenchmark for OrderIdGenerator: python benchmarks/bench_order_ids.py"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain.identity import OrderIdGenerator
+
+def bench_next_id(generator: OrderIdGenerator, count: int) -> float:
+    """IDs per second generating one at a time"""
+    next_id = generator.next_id
+    started = time.perf_counter()
+    for _ in range(count):
+        next_id()
+    return count / (time.perf_counter() - started)
+
+def bench_next_ids(generator: OrderIdGenerator, count: int, block: int) -> float:
+    """IDs per second reserving blocks of IDs"""
+    started = time.perf_counter()
+    for _ in range(count // block):
+        generator.next_ids(block)
+    return count / (time.perf_counter() - started)
+
+def check_ids(generator: OrderIdGenerator, count: int) -> None:
+    """IDs must be unique and sorted in generation order"""
+    ids = [generator.next_id() for _ in range(count)] + generator.next_ids(count)
+    assert len(set(ids)) == len(ids), "duplicate IDs"
+    assert ids == sorted(ids), "IDs not monotonic"
+
+def main():
+    count = int(os.getenv('BENCH_COUNT', '2000000'))
+    generator = OrderIdGenerator(node_id=1)
+    
+    check_ids(generator, 100000)
+    print(f"next_id():          {bench_next_id(generator, count):>14,.0f} ids/sec")
+    print(f"next_ids(1000):     {bench_next_ids(generator, count, 1000):>14,.0f} ids/sec")
+    print(f"sample:             {generator.next_id()}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""OrderRepository operation cost: python benchmarks/bench_repository.py
+
+Runs against the in-memory repository, RedisOrderRepository, and Redis
+behind CachedOrderRepository (find_by_id then hits the cache). Redis is
+BENCH_REDIS_URL when set, otherwise fakeredis if it is installed, so the
+Redis code path (pipelines, serialization, indexes) is covered without
+Docker; fakeredis numbers exclude network round trips.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain.entities import Order, OrderStatus
+from domain.interfaces import MetricsCollector
+from infrastructure.cached_repository import CachedOrderRepository
+from infrastructure.memory_repository import InMemoryOrderRepository
+from infrastructure.redis_repository import RedisOrderRepository
+
+class NullMetricsCollector(MetricsCollector):
+    """Discards cache metrics"""
+    
+    def increment_orders(self, status: str) -> None:
+        pass
+    
+    def record_order_value(self, value: float) -> None:
+        pass
+    
+    def increment_active_orders(self) -> None:
+        pass
+    
+    def decrement_active_orders(self) -> None:
+        pass
+    
+    def record_cache_lookup(self, result: str) -> None:
+        pass
+    
+    def record_cache_eviction(self, reason: str) -> None:
+        pass
+
+async def redis_repository():
+    """RedisOrderRepository on a real server or fakeredis; None if neither is available"""
+    repository = RedisOrderRepository()
+    if os.getenv('BENCH_REDIS_URL'):
+        repository.redis_url = os.environ['BENCH_REDIS_URL']
+        await repository.connect()
+        await repository.redis_client.flushdb()
+        return repository
+    try:
+        from fakeredis import aioredis as fakeredis
+    except ImportError:
+        return None
+    repository.redis_client = fakeredis.FakeRedis()
+    return repository
+
+async def timed(count: int, operation) -> float:
+    """Microseconds per call of an async operation"""
+    started = time.perf_counter()
+    for index in range(count):
+        await operation(index)
+    return (time.perf_counter() - started) / count * 1e6
+
+async def bench(repository, count: int, batch: int) -> dict[str, float]:
+    """Microseconds per call for each repository operation"""
+    orders = [Order(f"CUST-{index % 100}", 10.0 + index % 490) for index in range(count)]
+    outbox_orders = [Order(f"CUST-{index % 100}", 10.0 + index % 490) for index in range(count)]
+    cold_orders = [Order(f"CUST-{index % 100}", 10.0 + index % 490) for index in range(count // 10)]
+    batches = [orders[start:start + batch] for start in range(0, count, batch)]
+    
+    def mark_paid(order: Order) -> bool:
+        if order.status != OrderStatus.PLACED:
+            return False
+        order.mark_as_paid()
+        return True
+    
+    results = {}
+    results['save'] = await timed(count, lambda index: repository.save(orders[index]))
+    results[f'save_many({batch})'] = await timed(len(batches), lambda index: repository.save_many(batches[index]))
+    results['save_with_event'] = await timed(count, lambda index: repository.save_with_event(
+        outbox_orders[index], 'order.placed', {'event_type': 'OrderPlaced', 'order_id': outbox_orders[index].id}
+    ))
+    results['find_by_id'] = await timed(count, lambda index: repository.find_by_id(orders[index].id))
+    
+    # Saved past the cache, so it has never seen them
+    store = repository.repository if isinstance(repository, CachedOrderRepository) else repository
+    await store.save_many(cold_orders)
+    
+    async def cold_concurrent_reads(index: int):
+        # 100 readers of one order nobody has read yet: a cache coalesces them into one read
+        await asyncio.gather(*(repository.find_by_id(cold_orders[index].id) for _ in range(100)))
+    results['find_by_id(cold, 100x)'] = await timed(count // 10, cold_concurrent_reads)
+    results['find_by_customer_id(10)'] = await timed(
+        count // 10, lambda index: repository.find_by_customer_id(f"CUST-{index % 100}", limit=10)
+    )
+    results[f'update_many({batch})'] = await timed(
+        len(batches), lambda index: repository.update_many([order.id for order in batches[index]], mark_paid)
+    )
+    results['find_by_status(paid)'] = await timed(10, lambda index: repository.find_by_status(OrderStatus.PAID))
+    
+    assert len(await repository.find_by_status(OrderStatus.PAID)) == count
+    return results
+
+async def main():
+    count = int(os.getenv('BENCH_COUNT', '5000'))
+    batch = int(os.getenv('BENCH_BATCH_SIZE', '100'))
+    
+    backends = {'memory': InMemoryOrderRepository()}
+    redis = await redis_repository()
+    if redis is None:
+        print("Redis backend skipped: set BENCH_REDIS_URL or install fakeredis")
+    else:
+        backends['redis'] = redis
+        backends['cached'] = CachedOrderRepository(redis, NullMetricsCollector(), max_size=count * 2)
+    
+    print(f"{'operation':<26}" + "".join(f"{name + ' us':>14}" for name in backends))
+    results = {}
+    for name, repository in backends.items():
+        if name != 'memory':
+            await redis.redis_client.flushdb()
+        results[name] = await bench(repository, count, batch)
+    for operation in results['memory']:
+        print(f"{operation:<26}" + "".join(f"{results[name][operation]:>14.1f}" for name in backends))
+    
+    if redis is not None:
+        await redis.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""Order-service throughput on the in-memory bus and repository: python benchmarks/bench_service.py
+
+Measures place_order (create, save, publish directly or through the
+outbox relay) and the order-status projection applying payment and
+shipping events, without RabbitMQ or Redis.
+"""
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ecommerce_messaging import ConsumerConfig, InMemoryEventBus
+from application.outbox_relay import OutboxRelay
+from application.service import OrderApplicationService
+from application.projection import OrderStatusProjection
+from domain.entities import OrderStatus
+from domain.interfaces import MetricsCollector
+from infrastructure.memory_repository import InMemoryOrderRepository
+from infrastructure.messaging import ORDER_TOPOLOGY
+
+class NullMetricsCollector(MetricsCollector):
+    """Discards metrics so only the service itself is measured"""
+    
+    def increment_orders(self, status: str) -> None:
+        pass
+    
+    def record_order_value(self, value: float) -> None:
+        pass
+    
+    def increment_active_orders(self) -> None:
+        pass
+    
+    def decrement_active_orders(self) -> None:
+        pass
+    
+    def record_cache_lookup(self, result: str) -> None:
+        pass
+    
+    def record_cache_eviction(self, reason: str) -> None:
+        pass
+
+async def bench_place_order(codec: str, count: int, use_outbox: bool) -> tuple[float, float, float]:
+    """Orders/sec and CPU microseconds per order placed back to back, and orders/sec until all were published"""
+    bus = InMemoryEventBus("Order Service", topology=ORDER_TOPOLOGY, codec=codec)
+    await bus.connect()
+    repository = InMemoryOrderRepository()
+    service = OrderApplicationService(bus, NullMetricsCollector(), repository, use_outbox=use_outbox)
+    relay = asyncio.create_task(OutboxRelay(repository, bus).run()) if use_outbox else None
+    
+    started, cpu_started = time.perf_counter(), time.process_time()
+    for _ in range(count):
+        await service.place_order()
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    while bus.depth('orders') < count:
+        await asyncio.sleep(0.001)
+    published = time.perf_counter() - started
+    
+    if relay:
+        relay.cancel()
+        await asyncio.gather(relay, return_exceptions=True)
+    await bus.close()
+    return count / elapsed, cpu / count * 1e6, count / published
+
+async def bench_projection(codec: str, count: int, concurrency: int, batch: bool) -> tuple[float, float]:
+    """Events/sec and CPU microseconds per event for payment + shipping results of count orders.
+    
+    batch=False coalesces single deliveries in the projection; batch=True
+    hands it whole batches through subscribe_batch.
+    """
+    bus = InMemoryEventBus("Order Service", topology=ORDER_TOPOLOGY, codec=codec)
+    await bus.connect()
+    repository = InMemoryOrderRepository()
+    service = OrderApplicationService(bus, NullMetricsCollector(), repository, use_outbox=False)
+    projection = OrderStatusProjection(repository, NullMetricsCollector())
+    
+    for _ in range(count):
+        order = await service.place_order()
+        await bus.publish('payment.processed', {
+            'event_type': 'PaymentProcessed', 'event_id': uuid.uuid4().hex, 'order_id': order.id,
+            'amount': order.value.amount, 'success': True, 'timestamp': time.time()
+        })
+        await bus.publish('shipping.shipped', {
+            'event_type': 'OrderShipped', 'event_id': uuid.uuid4().hex, 'order_id': order.id,
+            'tracking_number': 'TRACK-123456', 'timestamp': time.time()
+        })
+    events = bus.depth('order-status')
+    
+    started, cpu_started = time.perf_counter(), time.process_time()
+    if batch:
+        await bus.subscribe_batch('order-status', projection.apply_events, max_batch=projection.batch_size,
+                                  config=ConsumerConfig(max_concurrency=max(1, concurrency // projection.batch_size)))
+    else:
+        await bus.subscribe('order-status', projection.handle, ConsumerConfig(max_concurrency=concurrency))
+    await bus.join('order-status')
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    
+    shipped = await repository.find_by_status(OrderStatus.SHIPPED)
+    assert len(shipped) == count and bus.failed == 0, "projection did not ship every order"
+    await bus.close()
+    return events / elapsed, cpu / events * 1e6
+
+def main():
+    count = int(os.getenv('BENCH_COUNT', '20000'))
+    concurrency = int(os.getenv('BENCH_CONCURRENCY', '100'))
+    codecs = os.getenv('BENCH_CODECS', 'json,msgpack,struct').split(',')
+    
+    print(f"order-service: {count} orders, projection concurrency {concurrency}")
+    for use_outbox in (False, True):
+        for codec in codecs:
+            rate, cpu_us, published_rate = asyncio.run(bench_place_order(codec, count, use_outbox))
+            label = 'place/outbox' if use_outbox else 'place_order'
+            print(f"  {label:<12} {codec:<8} {rate:>10,.0f} orders/sec {cpu_us:>8.1f} us CPU/order  "
+                  f"{published_rate:>10,.0f} published/sec")
+    for batch in (False, True):
+        for codec in codecs:
+            rate, cpu_us = asyncio.run(bench_projection(codec, count, concurrency, batch))
+            label = 'projection/b' if batch else 'projection'
+            print(f"  {label:<12} {codec:<8} {rate:>10,.0f} events/sec {cpu_us:>8.1f} us CPU/event")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""Order memory and storage format cost: python benchmarks/bench_storage.py
+
+Reports heap bytes per live Order (what a scan of the whole store holds
+in memory), and per storage format the stored value size and how many
+orders per second encode and decode.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain.entities import Order
+from infrastructure.order_storage import STORAGE_FORMATS
+
+def make_orders(count: int) -> list[Order]:
+    orders = [Order(f"CUST-{index % 1000}", 10.0 + index % 490) for index in range(count)]
+    for order in orders[::2]:
+        order.mark_as_paid()
+        order.mark_as_shipped(f"TRACK-{order.id[-6:]}")
+    return orders
+
+def bytes_per_order(count: int) -> float:
+    """Heap bytes per order, including its strings and Money"""
+    tracemalloc.start()
+    orders = make_orders(count)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / len(orders)
+
+def rate(operation, items: list) -> float:
+    started = time.perf_counter()
+    for item in items:
+        operation(item)
+    return len(items) / (time.perf_counter() - started)
+
+def main():
+    count = int(os.getenv('BENCH_COUNT', '100000'))
+    print(f"{count} orders, half of them shipped")
+    print(f"  Order in memory          {bytes_per_order(count):>8.0f} bytes/order")
+    
+    orders = make_orders(count)
+    for name, storage_format in STORAGE_FORMATS.items():
+        values = [storage_format.encode(order) for order in orders]
+        size = sum(map(len, values)) / count
+        encode_rate = rate(storage_format.encode, orders)
+        decode_rate = rate(storage_format.decode, values)
+        print(f"  {name:<8} {size:>8.0f} bytes stored {encode_rate:>10,.0f} encodes/sec {decode_rate:>10,.0f} decodes/sec")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
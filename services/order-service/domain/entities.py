@@ -1,5 +1,7 @@
+import time
 from enum import Enum
 from datetime import datetime
+from .identity import order_id_generator
 
 class OrderStatus(Enum):
     PLACED = "placed"
@@ -8,27 +10,51 @@ class OrderStatus(Enum):
     PAYMENT_FAILED = "payment_failed"
 
 class Order:
-    """Aggregate Root - Order"""
+    """Aggregate Root - Order.
+    
+    Slotted, with the creation time kept as an epoch float: repositories
+    materialize millions of these on scans, and a datetime per order costs
+    more than the rest of the order.
+    """
+    __slots__ = ('id', 'customer_id', 'value', 'status', 'created_ts', 'tracking_number')
+    
     def __init__(self, customer_id, value):
-        self.id = f"ORD-{int(datetime.now().timestamp())}"
+        self.id = order_id_generator.next_id()
         self.customer_id = customer_id
         self.value = Money(value)
         self.status = OrderStatus.PLACED
-        self.created_at = datetime.now()
-        
+        self.created_ts = time.time()
+        self.tracking_number = None
+    
+    @classmethod
+    def restore(cls, order_id, customer_id, value, status, created_ts, tracking_number=None):
+        """Rebuild a stored order without generating a new ID"""
+        order = cls.__new__(cls)
+        order.id = order_id
+        order.customer_id = customer_id
+        order.value = value
+        order.status = status
+        order.created_ts = created_ts
+        order.tracking_number = tracking_number
+        return order
+    
+    @property
+    def created_at(self):
+        return datetime.fromtimestamp(self.created_ts)
+    
     def can_process_payment(self):
         return self.status == OrderStatus.PLACED
-        
+    
     def mark_as_paid(self):
         if not self.can_process_payment():
             raise InvalidOrderStateException(f"Cannot pay order in {self.status} status")
         self.status = OrderStatus.PAID
-        
+    
     def mark_payment_failed(self):
         if not self.can_process_payment():
             raise InvalidOrderStateException(f"Cannot fail payment for order in {self.status} status")
         self.status = OrderStatus.PAYMENT_FAILED
-        
+    
     def mark_as_shipped(self, tracking_number):
         if self.status != OrderStatus.PAID:
             raise InvalidOrderStateException(f"Cannot ship unpaid order")
@@ -36,13 +62,27 @@ class Order:
         self.tracking_number = tracking_number
 
 class Money:
-    """Value Object - Money"""
+    """Value Object - Money, stored as integer cents"""
+    __slots__ = ('cents', 'currency')
+    
     def __init__(self, amount, currency="USD"):
         if amount < 0:
             raise ValueError("Amount cannot be negative")
-        self.amount = round(amount, 2)
+        self.cents = round(amount * 100)
         self.currency = currency
-        
+    
+    @classmethod
+    def from_cents(cls, cents, currency="USD"):
+        """Money from an exact cent count, skipping the float rounding"""
+        money = cls.__new__(cls)
+        money.cents = cents
+        money.currency = currency
+        return money
+    
+    @property
+    def amount(self):
+        return self.cents / 100
+    
     def __str__(self):
         return f"${self.amount}"
 
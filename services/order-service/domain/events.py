@@ -1,11 +1,14 @@
+import uuid
 from abc import ABC, abstractmethod
 from datetime import datetime
 
 class DomainEvent(ABC):
     """Abstract base class for all domain events"""
     
-    def __init__(self, timestamp=None):
+    def __init__(self, timestamp=None, event_id=None):
         self.timestamp = timestamp or datetime.now()
+        # Unique per event; consumers use it to drop redeliveries
+        self.event_id = event_id or uuid.uuid4().hex
     
     @abstractmethod
     def get_event_type(self) -> str:
@@ -32,8 +35,9 @@ class OrderPlacedEvent(DomainEvent):
     def to_dict(self) -> dict:
         return {
             "event_type": self.get_event_type(),
+            "event_id": self.event_id,
             "order_id": self.order_id,
             "customer_id": self.customer_id,
             "value": self.value,
-            "timestamp": self.timestamp.isoformat()
+            "timestamp": self.timestamp.timestamp()
         }
\ No newline at end of file
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import socket
+import threading
+import time
+
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+def _encode_base32(value: int, width: int) -> str:
+    """Fixed-width Crockford base32, so string order matches numeric order"""
+    return ''.join(CROCKFORD_ALPHABET[(value >> (5 * i)) & 31] for i in range(width - 1, -1, -1))
+
+class OrderIdGenerator:
+    """Snowflake-style generator for sortable, collision-free order IDs.
+    
+    An ID is milliseconds since EPOCH_MS (9 chars), a node ID (2 chars) and a
+    per-millisecond sequence (3 chars), each fixed-width Crockford base32, so
+    IDs sort by creation time. Node IDs keep replicas apart without any
+    coordination on the hot path, as long as every replica has its own.
+    """
+    
+    EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+    MAX_NODE_ID = (1 << 10) - 1
+    MAX_SEQUENCE = (1 << 12) - 1
+    SEQUENCE_CHARS = [_encode_base32(sequence, 3) for sequence in range(MAX_SEQUENCE + 1)]
+    
+    def __init__(self, node_id: int, prefix: str = "ORD-"):
+        if not 0 <= node_id <= self.MAX_NODE_ID:
+            raise ValueError(f"node_id must be between 0 and {self.MAX_NODE_ID}")
+        self.node_id = node_id
+        self.prefix = prefix
+        self.node_chars = _encode_base32(node_id, 2)
+        self.last_ms = 0
+        self.sequence = 0
+        self.head_ms = -1
+        self.head = ""
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_env(cls) -> 'OrderIdGenerator':
+        """Node ID from ORDER_NODE_ID, else derived from the hostname (single replica only).
+        
+        A 10-bit hash of two hostnames collides often enough that two
+        replicas may generate the same IDs, so with ORDER_REPLICAS above 1
+        ORDER_NODE_ID is required.
+        """
+        node_id = os.getenv('ORDER_NODE_ID')
+        if node_id is not None:
+            return cls(int(node_id))
+        
+        replicas = int(os.getenv('ORDER_REPLICAS', '1'))
+        if replicas > 1:
+            raise ValueError(f"ORDER_NODE_ID must be set to a distinct value per replica (ORDER_REPLICAS={replicas})")
+        hostname = socket.gethostname()
+        digest = hashlib.sha1(hostname.encode()).digest()
+        node_id = int.from_bytes(digest[:2], 'big') & cls.MAX_NODE_ID
+        print(f"Order IDs: node ID {node_id} derived from hostname {hostname}; set ORDER_NODE_ID when running more than one replica")
+        return cls(node_id)
+    
+    def next_id(self) -> str:
+        """Next ID, e.g. ORD-02J5PW6QE05000"""
+        with self.lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self.last_ms:
+                self.last_ms = now_ms
+                self.sequence = 0
+            else:
+                # Same millisecond or clock moved backwards: stay monotonic
+                self.sequence += 1
+                if self.sequence > self.MAX_SEQUENCE:
+                    # Sequence exhausted: borrow the next millisecond instead of spinning
+                    self.last_ms += 1
+                    self.sequence = 0
+            
+            if self.last_ms != self.head_ms:
+                self.head_ms = self.last_ms
+                self.head = self._head(self.last_ms)
+            return self.head + self.SEQUENCE_CHARS[self.sequence]
+    
+    def next_ids(self, count: int) -> list[str]:
+        """Reserve a block of IDs under a single lock acquisition"""
+        ids = []
+        with self.lock:
+            while count > 0:
+                now_ms = time.time_ns() // 1_000_000
+                if now_ms > self.last_ms:
+                    self.last_ms = now_ms
+                    start = 0
+                else:
+                    start = self.sequence + 1
+                    if start > self.MAX_SEQUENCE:
+                        self.last_ms += 1
+                        start = 0
+                
+                taken = min(count, self.MAX_SEQUENCE + 1 - start)
+                head = self._head(self.last_ms)
+                ids.extend([head + chars for chars in self.SEQUENCE_CHARS[start:start + taken]])
+                self.sequence = start + taken - 1
+                count -= taken
+        
+        return ids
+    
+    def _head(self, ms: int) -> str:
+        """Prefix, timestamp and node part shared by all IDs of one millisecond"""
+        return self.prefix + _encode_base32(ms - self.EPOCH_MS, 9) + self.node_chars
+
+order_id_generator = OrderIdGenerator.from_env()
\ No newline at end of file
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Optional
-from .entities import Order
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from .entities import Order, OrderStatus
 
 class EventBus(ABC):
     """Domain interface for event publishing"""
@@ -11,8 +11,29 @@ class EventBus(ABC):
         pass
     
     @abstractmethod
-    def publish(self, routing_key: str, event: Any) -> None:
-        """Publish domain event"""
+    async def publish(self, routing_key: str, event: Any, trace_headers: Optional[dict] = None) -> Awaitable[None]:
+        """Publish domain event.
+        
+        Awaiting the call applies backpressure; the returned awaitable
+        resolves once delivery is confirmed. trace_headers continue a trace
+        captured with current_trace_headers() when the event was created.
+        """
+        pass
+    
+    @abstractmethod
+    def current_trace_headers(self) -> dict:
+        """Trace context to store with an event that is published later"""
+        pass
+    
+    @abstractmethod
+    async def subscribe(self, queue_name: str, callback: Callable[[dict], Awaitable[None]]) -> None:
+        """Subscribe to queue messages"""
+        pass
+    
+    @abstractmethod
+    async def subscribe_batch(self, queue_name: str, handler: Callable[[list[dict]], Awaitable[Optional[list]]],
+                              max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None) -> None:
+        """Subscribe with a handler that takes a list of events; raising fails the whole batch"""
         pass
     
     @abstractmethod
@@ -42,6 +63,16 @@ class MetricsCollector(ABC):
     def decrement_active_orders(self) -> None:
         """Decrement active orders gauge"""
         pass
+    
+    @abstractmethod
+    def record_cache_lookup(self, result: str) -> None:
+        """Count an order cache lookup: hit, miss or coalesced (joined a read in flight)"""
+        pass
+    
+    @abstractmethod
+    def record_cache_eviction(self, reason: str) -> None:
+        """Count an order dropped from the cache: size or expired"""
+        pass
 
 class OrderRepository(ABC):
     """Domain interface for order persistence"""
@@ -51,6 +82,17 @@ class OrderRepository(ABC):
         """Save order"""
         pass
     
+    @abstractmethod
+    async def save_many(self, orders: list[Order]) -> None:
+        """Save a batch of orders in one round trip"""
+        pass
+    
+    @abstractmethod
+    async def save_with_event(self, order: Order, routing_key: str, event: dict,
+                              trace_headers: Optional[dict] = None) -> None:
+        """Save order and append the event, with the trace it is published under, to the outbox in one atomic write"""
+        pass
+    
     @abstractmethod
     async def find_by_id(self, order_id: str) -> Optional[Order]:
         """Find order by ID"""
@@ -62,6 +104,34 @@ class OrderRepository(ABC):
         pass
     
     @abstractmethod
-    async def find_by_customer_id(self, customer_id: str) -> list[Order]:
-        """Find orders by customer ID"""
+    def iter_all(self, batch_size: int = 500) -> AsyncIterator[Order]:
+        """Stream all orders in batches without loading them all into memory"""
+        pass
+    
+    @abstractmethod
+    async def find_by_customer_id(self, customer_id: str, offset: int = 0, limit: Optional[int] = None) -> list[Order]:
+        """Find orders by customer ID, newest first; limit=N gives the latest N orders"""
+        pass
+    
+    @abstractmethod
+    async def find_by_status(self, status: OrderStatus) -> list[Order]:
+        """Find orders currently in a status"""
+        pass
+    
+    @abstractmethod
+    async def update_many(self, order_ids: list[str], apply: Callable[[Order], bool]) -> list[tuple[Order, OrderStatus]]:
+        """Atomically read-modify-write a batch of orders; returns (order, previous status) for changed ones"""
+        pass
+
+class EventOutbox(ABC):
+    """Domain interface for events written alongside orders and published later"""
+    
+    @abstractmethod
+    async def claim(self, count: int) -> list[tuple[str, str, dict, Optional[dict]]]:
+        """Up to count unpublished entries as (entry ID, routing key, event, trace headers), oldest first; waits briefly if there are none"""
+        pass
+    
+    @abstractmethod
+    async def complete(self, entry_ids: list[str]) -> None:
+        """Remove entries whose events were published"""
         pass
\ No newline at end of file
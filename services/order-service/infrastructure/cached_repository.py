@@ -0,0 +1,124 @@
+import asyncio
+import copy
+import os
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Optional
+from domain.interfaces import EventOutbox, MetricsCollector, OrderRepository
+from domain.entities import Order, OrderStatus
+
+class CachedOrderRepository(OrderRepository, EventOutbox):
+    """Read-through cache of orders by ID in front of another repository.
+    
+    find_by_id answers from an LRU of at most max_size orders, each kept for
+    ttl seconds; concurrent misses for the same order share one read of the
+    wrapped repository. Writes go through and refresh the cached copy, so
+    the projection applying payment.* and shipping.* events keeps cached
+    orders current in this process. Nothing tells other processes: each
+    payment or shipping result reaches one replica's projection, and the
+    others serve their copy until the TTL expires, so the cache is only
+    coherent with a single order-service process. A read that overlaps a
+    write of the same order is returned but not cached. Scans and index
+    queries bypass the cache.
+    """
+    
+    def __init__(self, repository: OrderRepository, metrics: MetricsCollector,
+                 max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.repository = repository
+        self.metrics = metrics
+        self.max_size = max_size if max_size is not None else int(os.getenv('ORDER_CACHE_SIZE', '10000'))
+        self.ttl = ttl if ttl is not None else float(os.getenv('ORDER_CACHE_TTL_SECONDS', '30'))
+        self.entries: OrderedDict[str, tuple[float, Order]] = OrderedDict()
+        self.loading: dict[str, asyncio.Task] = {}
+    
+    async def connect(self):
+        await self.repository.connect()
+    
+    async def close(self):
+        await self.repository.close()
+    
+    async def find_by_id(self, order_id: str) -> Optional[Order]:
+        """Cached order if fresh, otherwise one shared read of the wrapped repository"""
+        entry = self.entries.get(order_id)
+        if entry is not None:
+            expires_at, order = entry
+            if expires_at > time.monotonic():
+                self.entries.move_to_end(order_id)
+                self.metrics.record_cache_lookup('hit')
+                return copy.copy(order)
+            del self.entries[order_id]
+            self.metrics.record_cache_eviction('expired')
+        
+        loading = self.loading.get(order_id)
+        if loading is None:
+            self.metrics.record_cache_lookup('miss')
+            loading = asyncio.create_task(self._load(order_id))
+            self.loading[order_id] = loading
+        else:
+            self.metrics.record_cache_lookup('coalesced')
+        
+        # Shielded so a cancelled caller doesn't cancel the read for the others
+        order = await asyncio.shield(loading)
+        return copy.copy(order) if order else None
+    
+    async def _load(self, order_id: str) -> Optional[Order]:
+        """Read an order and cache it, unless it was written meanwhile"""
+        task = asyncio.current_task()
+        try:
+            order = await self.repository.find_by_id(order_id)
+            if order is not None and self.loading.get(order_id) is task:
+                self._put(order)
+            return order
+        finally:
+            if self.loading.get(order_id) is task:
+                del self.loading[order_id]
+    
+    def _put(self, order: Order) -> None:
+        self.entries[order.id] = (time.monotonic() + self.ttl, copy.copy(order))
+        self.entries.move_to_end(order.id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.metrics.record_cache_eviction('size')
+    
+    def _refresh(self, orders: list[Order]) -> None:
+        """Cache freshly written orders; reads still in flight for them won't be cached"""
+        for order in orders:
+            self.loading.pop(order.id, None)
+            self._put(order)
+    
+    async def save(self, order: Order) -> None:
+        await self.repository.save(order)
+        self._refresh([order])
+    
+    async def save_many(self, orders: list[Order]) -> None:
+        await self.repository.save_many(orders)
+        self._refresh(orders)
+    
+    async def save_with_event(self, order: Order, routing_key: str, event: dict,
+                              trace_headers: Optional[dict] = None) -> None:
+        await self.repository.save_with_event(order, routing_key, event, trace_headers)
+        self._refresh([order])
+    
+    async def update_many(self, order_ids: list[str], apply: Callable[[Order], bool]) -> list[tuple[Order, OrderStatus]]:
+        """Read-modify-write on the wrapped repository, never on cached copies"""
+        changed = await self.repository.update_many(order_ids, apply)
+        self._refresh([order for order, _ in changed])
+        return changed
+    
+    async def find_all(self) -> list[Order]:
+        return await self.repository.find_all()
+    
+    def iter_all(self, batch_size: int = 500) -> AsyncIterator[Order]:
+        return self.repository.iter_all(batch_size)
+    
+    async def find_by_customer_id(self, customer_id: str, offset: int = 0, limit: Optional[int] = None) -> list[Order]:
+        return await self.repository.find_by_customer_id(customer_id, offset, limit)
+    
+    async def find_by_status(self, status: OrderStatus) -> list[Order]:
+        return await self.repository.find_by_status(status)
+    
+    async def claim(self, count: int) -> list[tuple[str, str, dict, Optional[dict]]]:
+        return await self.repository.claim(count)
+    
+    async def complete(self, entry_ids: list[str]) -> None:
+        await self.repository.complete(entry_ids)
\ No newline at end of file
@@ -0,0 +1,126 @@
+import asyncio
+import bisect
+import copy
+import itertools
+from typing import AsyncIterator, Callable, Optional
+from domain.interfaces import EventOutbox, OrderRepository
+from domain.entities import Order, OrderStatus
+
+class InMemoryOrderRepository(OrderRepository, EventOutbox):
+    """In-process implementation of OrderRepository for benchmarks and local runs.
+    
+    Keeps the same indexes as RedisOrderRepository (customer orders by
+    creation time, order IDs by status). Orders are copied on the way in and
+    out, so callers can't change stored state without saving, just like with
+    Redis. The outbox is a dict of entries in insertion order.
+    """
+    
+    def __init__(self):
+        self.orders: dict[str, Order] = {}
+        self.customer_index: dict[str, list[tuple[float, str]]] = {}
+        self.status_index: dict[OrderStatus, set[str]] = {}
+        self.outbox: dict[str, tuple[str, dict, Optional[dict]]] = {}
+        self.outbox_claimed: set[str] = set()
+        self.outbox_ids = itertools.count(1)
+        self.outbox_added = asyncio.Event()
+    
+    async def connect(self):
+        """Nothing to connect to"""
+        pass
+    
+    async def close(self):
+        """Nothing to close"""
+        pass
+    
+    async def save(self, order: Order) -> None:
+        """Save order and index it"""
+        self._store(order)
+    
+    async def save_many(self, orders: list[Order]) -> None:
+        """Save a batch of orders"""
+        for order in orders:
+            self._store(order)
+    
+    async def save_with_event(self, order: Order, routing_key: str, event: dict,
+                              trace_headers: Optional[dict] = None) -> None:
+        """Save order and append its event to the outbox"""
+        self._store(order)
+        self.outbox[str(next(self.outbox_ids))] = (routing_key, copy.deepcopy(event), trace_headers)
+        self.outbox_added.set()
+    
+    async def claim(self, count: int) -> list[tuple[str, str, dict, Optional[dict]]]:
+        """Oldest unclaimed outbox entries, waiting up to 100ms for one"""
+        entries = self._unclaimed(count)
+        if not entries:
+            self.outbox_added.clear()
+            try:
+                await asyncio.wait_for(self.outbox_added.wait(), 0.1)
+            except asyncio.TimeoutError:
+                return []
+            entries = self._unclaimed(count)
+        self.outbox_claimed.update(entry_id for entry_id, *_ in entries)
+        return entries
+    
+    def _unclaimed(self, count: int) -> list[tuple[str, str, dict, Optional[dict]]]:
+        entries = []
+        for entry_id, (routing_key, event, trace_headers) in self.outbox.items():
+            if entry_id not in self.outbox_claimed:
+                entries.append((entry_id, routing_key, event, trace_headers))
+                if len(entries) == count:
+                    break
+        return entries
+    
+    async def complete(self, entry_ids: list[str]) -> None:
+        """Drop published entries"""
+        for entry_id in entry_ids:
+            self.outbox.pop(entry_id, None)
+            self.outbox_claimed.discard(entry_id)
+    
+    def _store(self, order: Order) -> None:
+        """Store a copy of the order and keep both indexes in step"""
+        previous = self.orders.get(order.id)
+        if previous is None:
+            bisect.insort(self.customer_index.setdefault(order.customer_id, []), (order.created_ts, order.id))
+        elif previous.status != order.status:
+            self.status_index[previous.status].discard(order.id)
+        
+        self.orders[order.id] = copy.copy(order)
+        self.status_index.setdefault(order.status, set()).add(order.id)
+    
+    async def update_many(self, order_ids: list[str], apply: Callable[[Order], bool]) -> list[tuple[Order, OrderStatus]]:
+        """Read-modify-write a batch of orders; the event loop makes it atomic"""
+        changed = []
+        for order_id in dict.fromkeys(order_ids):
+            stored = self.orders.get(order_id)
+            if stored is None:
+                continue
+            order = copy.copy(stored)
+            previous_status = order.status
+            if apply(order):
+                self._store(order)
+                changed.append((order, previous_status))
+        return changed
+    
+    async def find_by_id(self, order_id: str) -> Optional[Order]:
+        """Find order by ID"""
+        order = self.orders.get(order_id)
+        return copy.copy(order) if order else None
+    
+    async def find_all(self) -> list[Order]:
+        """Find all orders"""
+        return [copy.copy(order) for order in self.orders.values()]
+    
+    async def iter_all(self, batch_size: int = 500) -> AsyncIterator[Order]:
+        """Stream all orders"""
+        for order in list(self.orders.values()):
+            yield copy.copy(order)
+    
+    async def find_by_customer_id(self, customer_id: str, offset: int = 0, limit: Optional[int] = None) -> list[Order]:
+        """Find orders by customer ID, newest first"""
+        index = self.customer_index.get(customer_id, [])
+        newest_first = index[::-1][offset:None if limit is None else offset + limit]
+        return [copy.copy(self.orders[order_id]) for _, order_id in newest_first]
+    
+    async def find_by_status(self, status: OrderStatus) -> list[Order]:
+        """Find orders currently in a status"""
+        return [copy.copy(self.orders[order_id]) for order_id in self.status_index.get(status, ())]
\ No newline at end of file
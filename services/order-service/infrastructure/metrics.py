@@ -1,4 +1,5 @@
 from prometheus_client import Counter, Histogram, Gauge, start_http_server
+from ecommerce_messaging.metrics import LabelChildren
 from domain.interfaces import MetricsCollector
 
 class PrometheusMetricsCollector(MetricsCollector):
@@ -7,9 +8,28 @@ class PrometheusMetricsCollector(MetricsCollector):
     def __init__(self):
         # Business metrics
         self.orders_total = Counter('orders_total', 'Total orders', ['status'])
-        self.order_value = Histogram('order_value_dollars', 'Order value in dollars')
+        # Orders are generated between MIN_ORDER_VALUE and MAX_ORDER_VALUE (10-500 by default)
+        self.order_value = Histogram(
+            'order_value_dollars', 'Order value in dollars',
+            buckets=(10, 25, 50, 75, 100, 150, 200, 250, 300, 400, 500, 750, 1000)
+        )
         self.active_orders = Gauge('active_orders_count', 'Active orders count')
         
+        # Order cache metrics; hit ratio = hit / sum over results
+        self.cache_lookups = Counter('order_cache_lookups_total', 'Order cache lookups', ['result'])
+        self.cache_evictions = Counter('order_cache_evictions_total', 'Orders dropped from the cache', ['reason'])
+        
+        # Bound once, so each increment is a dict lookup; series exist from the first scrape
+        self.orders_by_status = LabelChildren(self.orders_total)
+        self.cache_lookups_by_result = LabelChildren(self.cache_lookups)
+        self.cache_evictions_by_reason = LabelChildren(self.cache_evictions)
+        for status in ('placed', 'paid', 'shipped', 'payment_failed'):
+            self.orders_by_status[status]
+        for result in ('hit', 'miss', 'coalesced'):
+            self.cache_lookups_by_result[result]
+        for reason in ('size', 'expired'):
+            self.cache_evictions_by_reason[reason]
+        
     def start_server(self, port: int = 8000) -> None:
         """Start Prometheus metrics server"""
         start_http_server(port)
@@ -17,7 +37,7 @@ class PrometheusMetricsCollector(MetricsCollector):
     # Specific business methods
     def increment_orders(self, status: str) -> None:
         """Increment orders counter"""
-        self.orders_total.labels(status=status).inc()
+        self.orders_by_status[status].inc()
         
     def record_order_value(self, value: float) -> None:
         """Record order value"""
@@ -29,4 +49,12 @@ class PrometheusMetricsCollector(MetricsCollector):
         
     def decrement_active_orders(self) -> None:
         """Decrement active orders gauge"""
-        self.active_orders.dec()
\ No newline at end of file
+        self.active_orders.dec()
+        
+    def record_cache_lookup(self, result: str) -> None:
+        """Count an order cache lookup"""
+        self.cache_lookups_by_result[result].inc()
+        
+    def record_cache_eviction(self, reason: str) -> None:
+        """Count an order dropped from the cache"""
+        self.cache_evictions_by_reason[reason].inc()
\ No newline at end of file
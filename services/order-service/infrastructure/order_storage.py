@@ -0,0 +1,111 @@
+import json
+import os
+import struct
+import sys
+from abc import ABC, abstractmethod
+from datetime import datetime
+from domain.entities import Order, OrderStatus, Money
+
+class OrderStorageFormat(ABC):
+    """Serializes orders to the string values stored under order:<id>"""
+    
+    name = ''
+    
+    @abstractmethod
+    def encode(self, order: Order) -> bytes:
+        pass
+    
+    @abstractmethod
+    def decode(self, data: bytes) -> Order:
+        pass
+
+class JsonOrderFormat(OrderStorageFormat):
+    """The original JSON document, readable by every order-service version"""
+    
+    name = 'json'
+    
+    def encode(self, order: Order) -> bytes:
+        order_data = {
+            'id': order.id,
+            'customer_id': order.customer_id,
+            'value': order.value.amount,
+            'currency': order.value.currency,
+            'status': order.status.value,
+            'created_at': datetime.fromtimestamp(order.created_ts).isoformat()
+        }
+        if order.tracking_number:
+            order_data['tracking_number'] = order.tracking_number
+        return json.dumps(order_data).encode()
+    
+    def decode(self, data: bytes) -> Order:
+        order_data = json.loads(data)
+        return Order.restore(
+            order_data['id'],
+            order_data['customer_id'],
+            Money(order_data['value'], sys.intern(order_data['currency'])),
+            OrderStatus(order_data['status']),
+            datetime.fromisoformat(order_data['created_at']).timestamp(),
+            order_data.get('tracking_number')
+        )
+
+class PackedOrderFormat(OrderStorageFormat):
+    """Struct-packed orders, about a third of the JSON size and several times faster to decode.
+    
+    Layout: format version and status code (one byte each), cents (int64),
+    created_ts (float64), one uint16 length per string field (id,
+    customer_id, currency, tracking_number), then the UTF-8 string bytes.
+    The version byte is never '{', which tells packed values from JSON ones.
+    """
+    
+    name = 'packed'
+    VERSION = 1
+    HEADER = struct.Struct('<BBqdHHHH')
+    STATUSES = (OrderStatus.PLACED, OrderStatus.PAID, OrderStatus.SHIPPED, OrderStatus.PAYMENT_FAILED)
+    STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+    
+    def encode(self, order: Order) -> bytes:
+        order_id = order.id.encode()
+        customer_id = order.customer_id.encode()
+        currency = order.value.currency.encode()
+        tracking_number = (order.tracking_number or '').encode()
+        return self.HEADER.pack(
+            self.VERSION, self.STATUS_CODES[order.status], order.value.cents, order.created_ts,
+            len(order_id), len(customer_id), len(currency), len(tracking_number)
+        ) + order_id + customer_id + currency + tracking_number
+    
+    def decode(self, data: bytes) -> Order:
+        version, status, cents, created_ts, id_length, customer_length, currency_length, tracking_length = (
+            self.HEADER.unpack_from(data)
+        )
+        if version != self.VERSION:
+            raise ValueError(f"Unknown packed order version {version}")
+        
+        start = self.HEADER.size
+        customer_start = start + id_length
+        currency_start = customer_start + customer_length
+        tracking_start = currency_start + currency_length
+        return Order.restore(
+            data[start:customer_start].decode(),
+            data[customer_start:currency_start].decode(),
+            Money.from_cents(cents, sys.intern(data[currency_start:tracking_start].decode())),
+            self.STATUSES[status],
+            created_ts,
+            data[tracking_start:tracking_start + tracking_length].decode() or None
+        )
+
+STORAGE_FORMATS = {storage_format.name: storage_format for storage_format in (JsonOrderFormat(), PackedOrderFormat())}
+
+def storage_format_from_env() -> OrderStorageFormat:
+    """Format new writes use, from ORDER_STORAGE_FORMAT (json | packed)"""
+    name = os.getenv('ORDER_STORAGE_FORMAT', 'json')
+    if name not in STORAGE_FORMATS:
+        raise ValueError(f"ORDER_STORAGE_FORMAT must be one of {', '.join(STORAGE_FORMATS)}, got {name!r}")
+    return STORAGE_FORMATS[name]
+
+def format_of(data: bytes) -> OrderStorageFormat:
+    """Format a stored value was written in"""
+    return STORAGE_FORMATS['json'] if data[:1] == b'{' else STORAGE_FORMATS['packed']
+
+def decode_order(data: bytes) -> Order:
+    """Decode a stored order in whichever format it was written"""
+    return format_of(data).decode(data)
\ No newline at end of file
@@ -1,21 +1,49 @@
 import json
 import os
-from typing import Optional
+import socket
+from typing import AsyncIterator, Callable, Optional
 import redis.asyncio as redis
-from domain.interfaces import OrderRepository
-from domain.entities import Order, OrderStatus, Money
+from redis.exceptions import ResponseError, WatchError
+from domain.interfaces import EventOutbox, OrderRepository
+from domain.entities import Order, OrderStatus
+from infrastructure.order_storage import decode_order, format_of, storage_format_from_env
 
-class RedisOrderRepository(OrderRepository):
-    """Redis implementation of OrderRepository"""
+class RedisOrderRepository(OrderRepository, EventOutbox):
+    """Redis implementation of OrderRepository, with the event outbox as a Redis Stream.
+    
+    save_with_event writes the order and XADDs the event in one MULTI, so
+    an order is never stored without its event. The relay reads the stream
+    through a consumer group: each order-service replica claims its own
+    entries, re-reads what it claimed but didn't finish after a restart,
+    and takes over entries another replica left idle for too long. Entries
+    are XACKed and XDELed once published, which keeps the stream short.
+    
+    Orders are written in ORDER_STORAGE_FORMAT (JSON or struct-packed) and
+    read in whichever format they were stored, so the format can be
+    switched on a live store and migrate_storage_format run afterwards.
+    """
     
     def __init__(self):
         self.redis_url = os.getenv('REDIS_URL', 'redis://redis:6379')
         self.redis_client = None
         self.key_prefix = "order:"
+        self.storage_format = storage_format_from_env()
+        self.outbox_key = "outbox:orders"
+        self.outbox_group = "relay"
+        self.outbox_consumer = os.getenv('HOSTNAME') or socket.gethostname()
+        self.outbox_block_ms = int(os.getenv('OUTBOX_POLL_INTERVAL_MS', '100'))
+        self.outbox_claim_idle_ms = int(os.getenv('OUTBOX_CLAIM_IDLE_MS', '30000'))
+        self.outbox_recheck_own = True
     
     async def connect(self):
-        """Connect to Redis"""
+        """Connect to Redis and make sure the outbox consumer group exists"""
         self.redis_client = redis.from_url(self.redis_url)
+        try:
+            # From '0' so entries written before the group existed are relayed too
+            await self.redis_client.xgroup_create(self.outbox_key, self.outbox_group, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
     
     async def close(self):
         """Close Redis connection"""
@@ -23,22 +51,119 @@ class RedisOrderRepository(OrderRepository):
             await self.redis_client.close()
     
     async def save(self, order: Order) -> None:
-        """Save order to Redis"""
-        order_data = {
-            'id': order.id,
-            'customer_id': order.customer_id,
-            'value': order.value.amount,
-            'currency': order.value.currency,
-            'status': order.status.value,
-            'created_at': order.created_at.isoformat()
-        }
+        """Save order and its customer index entry atomically in one round trip"""
+        await self.save_many([order])
+    
+    async def save_many(self, orders: list[Order]) -> None:
+        """Save a batch of orders in a single MULTI/EXEC pipeline"""
+        if not orders:
+            return
         
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            for order in orders:
+                self._queue_save(pipe, order)
+            await pipe.execute()
+    
+    async def save_with_event(self, order: Order, routing_key: str, event: dict,
+                              trace_headers: Optional[dict] = None) -> None:
+        """Save order and append its event to the outbox stream in one MULTI/EXEC"""
+        fields = {'routing_key': routing_key, 'event': json.dumps(event)}
+        if trace_headers:
+            fields['trace'] = json.dumps(trace_headers)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            self._queue_save(pipe, order)
+            pipe.xadd(self.outbox_key, fields)
+            await pipe.execute()
+    
+    async def claim(self, count: int) -> list[tuple[str, str, dict, Optional[dict]]]:
+        """Claim outbox entries: our own unfinished ones first, then new ones, then idle ones of other relays"""
+        if self.outbox_recheck_own:
+            entries = await self._read_group('0', count)
+            if entries:
+                return entries
+            self.outbox_recheck_own = False
+        
+        entries = await self._read_group('>', count, block=self.outbox_block_ms)
+        if entries:
+            return entries
+        
+        _, claimed, _ = await self.redis_client.xautoclaim(
+            self.outbox_key, self.outbox_group, self.outbox_consumer, self.outbox_claim_idle_ms, count=count
+        )
+        return self._parse_entries(claimed)
+    
+    async def _read_group(self, start: str, count: int, block: Optional[int] = None) -> list[tuple[str, str, dict, Optional[dict]]]:
+        """XREADGROUP from the outbox: '0' re-reads our pending entries, '>' reads new ones"""
+        result = await self.redis_client.xreadgroup(
+            self.outbox_group, self.outbox_consumer, {self.outbox_key: start}, count=count, block=block
+        )
+        return self._parse_entries(result[0][1] if result else [])
+    
+    def _parse_entries(self, entries: list) -> list[tuple[str, str, dict, Optional[dict]]]:
+        """(entry ID, routing key, event, trace headers) of raw stream entries; deleted ones come back without fields"""
+        parsed = []
+        for entry_id, fields in entries:
+            if fields:
+                # Entries written by earlier versions carry no trace
+                trace_headers = json.loads(fields[b'trace']) if b'trace' in fields else None
+                parsed.append((
+                    entry_id.decode(), fields[b'routing_key'].decode(), json.loads(fields[b'event']), trace_headers
+                ))
+        return parsed
+    
+    async def complete(self, entry_ids: list[str]) -> None:
+        """Acknowledge published entries and trim them from the stream"""
+        if not entry_ids:
+            return
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.xack(self.outbox_key, self.outbox_group, *entry_ids)
+            pipe.xdel(self.outbox_key, *entry_ids)
+            await pipe.execute()
+    
+    def _queue_save(self, pipe, order: Order) -> None:
+        """Queue the writes for one order on a pipeline"""
         key = f"{self.key_prefix}{order.id}"
-        await self.redis_client.set(key, json.dumps(order_data))
+        pipe.set(key, self.storage_format.encode(order))
+        
+        # Add to customer index, ordered by creation time
+        pipe.zadd(self._customer_key(order.customer_id), {order.id: order.created_ts})
+        pipe.sadd(self._status_key(order.status), order.id)
+    
+    async def update_many(self, order_ids: list[str], apply: Callable[[Order], bool]) -> list[tuple[Order, OrderStatus]]:
+        """Read-modify-write a batch of orders in one WATCH/MULTI round.
         
-        # Add to customer index
-        customer_key = f"customer:{order.customer_id}:orders"
-        await self.redis_client.sadd(customer_key, order.id)
+        apply mutates an order in place and returns False to leave it alone.
+        If another client touches one of the orders meanwhile, the whole batch
+        is re-read and apply runs again, so it must only mutate the order.
+        Returns (order, previous status) for every order that changed.
+        """
+        keys = [f"{self.key_prefix}{order_id}" for order_id in dict.fromkeys(order_ids)]
+        if not keys:
+            return []
+        
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(*keys)
+                    changed = []
+                    for data in await pipe.mget(keys):
+                        if not data:
+                            continue
+                        order = decode_order(data)
+                        previous_status = order.status
+                        if apply(order):
+                            changed.append((order, previous_status))
+                    
+                    pipe.multi()
+                    for order, previous_status in changed:
+                        pipe.set(f"{self.key_prefix}{order.id}", self.storage_format.encode(order))
+                        if order.status != previous_status:
+                            pipe.srem(self._status_key(previous_status), order.id)
+                            pipe.sadd(self._status_key(order.status), order.id)
+                    await pipe.execute()
+                    return changed
+                except WatchError:
+                    continue
     
     async def find_by_id(self, order_id: str) -> Optional[Order]:
         """Find order by ID"""
@@ -48,44 +173,159 @@ class RedisOrderRepository(OrderRepository):
         if not data:
             return None
         
-        order_data = json.loads(data)
-        return self._deserialize_order(order_data)
+        return decode_order(data)
     
     async def find_all(self) -> list[Order]:
         """Find all orders"""
-        keys = await self.redis_client.keys(f"{self.key_prefix}*")
-        orders = []
-        
-        for key in keys:
-            data = await self.redis_client.get(key)
-            if data:
-                order_data = json.loads(data)
-                orders.append(self._deserialize_order(order_data))
-        
-        return orders
-    
-    async def find_by_customer_id(self, customer_id: str) -> list[Order]:
-        """Find orders by customer ID"""
-        customer_key = f"customer:{customer_id}:orders"
-        order_ids = await self.redis_client.smembers(customer_key)
-        
-        orders = []
-        for order_id in order_ids:
-            order = await self.find_by_id(order_id.decode())
-            if order:
-                orders.append(order)
-        
-        return orders
-    
-    def _deserialize_order(self, order_data: dict) -> Order:
-        """Convert dict back to Order object"""
-        from datetime import datetime
-        
-        order = Order.__new__(Order)  # Create without calling __init__
-        order.id = order_data['id']
-        order.customer_id = order_data['customer_id']
-        order.value = Money(order_data['value'], order_data['currency'])
-        order.status = OrderStatus(order_data['status'])
-        order.created_at = datetime.fromisoformat(order_data['created_at'])
-        
-        return order
\ No newline at end of file
+        return [order async for order in self.iter_all()]
+    
+    async def iter_all(self, batch_size: int = 500) -> AsyncIterator[Order]:
+        """Stream all orders, one SCAN + MGET round trip per batch.
+        
+        Orders are deserialized lazily as the caller consumes them. Like any
+        SCAN, a key may be yielded twice if the keyspace is rehashed meanwhile.
+        """
+        async for keys in self._scan_batches(f"{self.key_prefix}*", batch_size):
+            for data in await self.redis_client.mget(keys):
+                # Key may have been deleted between SCAN and MGET
+                if data:
+                    yield decode_order(data)
+    
+    async def find_by_customer_id(self, customer_id: str, offset: int = 0, limit: Optional[int] = None) -> list[Order]:
+        """Find orders by customer ID, newest first, in two round trips"""
+        end = -1 if limit is None else offset + limit - 1
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.zrevrange(self._customer_key(customer_id), offset, end)
+            pipe.exists(self._legacy_customer_key(customer_id))
+            order_ids, has_legacy_index = await pipe.execute()
+        if has_legacy_index:
+            # Orders indexed before the sorted sets: move them over, then read again
+            await self._migrate_customer_index(self._legacy_customer_key(customer_id))
+            order_ids = await self.redis_client.zrevrange(self._customer_key(customer_id), offset, end)
+        if not order_ids:
+            return []
+        
+        keys = [f"{self.key_prefix}{order_id.decode()}" for order_id in order_ids]
+        return [
+            decode_order(data)
+            for data in await self.redis_client.mget(keys)
+            if data
+        ]
+    
+    async def find_by_status(self, status: OrderStatus) -> list[Order]:
+        """Find orders currently in a status via its index, O(result)"""
+        order_ids = await self.redis_client.smembers(self._status_key(status))
+        if not order_ids:
+            return []
+        
+        keys = [f"{self.key_prefix}{order_id.decode()}" for order_id in order_ids]
+        return [
+            decode_order(data)
+            for data in await self.redis_client.mget(keys)
+            if data
+        ]
+    
+    async def migrate_customer_indexes(self) -> int:
+        """Rebuild sorted-set customer indexes from the legacy customer:<id>:orders sets"""
+        migrated = 0
+        async for legacy_key in self.redis_client.scan_iter(match=self._legacy_customer_key('*'), count=500):
+            await self._migrate_customer_index(legacy_key)
+            migrated += 1
+        
+        return migrated
+    
+    async def _migrate_customer_index(self, legacy_key) -> None:
+        """Move one customer's legacy set into its sorted-set index"""
+        order_ids = await self.redis_client.smembers(legacy_key)
+        keys = [f"{self.key_prefix}{order_id.decode()}" for order_id in order_ids]
+        orders = [
+            decode_order(data)
+            for data in (await self.redis_client.mget(keys) if keys else [])
+            if data
+        ]
+        
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            for order in orders:
+                pipe.zadd(self._customer_key(order.customer_id), {order.id: order.created_ts})
+            pipe.delete(legacy_key)
+            await pipe.execute()
+    
+    async def migrate_storage_format(self, batch_size: int = 500) -> int:
+        """Rewrite orders stored in another format in the configured one; returns how many were rewritten.
+        
+        Runs batch by batch under WATCH, so orders the projection updates
+        meanwhile are re-read rather than overwritten with stale data.
+        Safe to run repeatedly and while the service is serving traffic.
+        """
+        migrated = 0
+        async for keys in self._scan_batches(f"{self.key_prefix}*", batch_size):
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        await pipe.watch(*keys)
+                        stale = [
+                            (key, decode_order(data))
+                            for key, data in zip(keys, await pipe.mget(keys))
+                            if data and format_of(data) is not self.storage_format
+                        ]
+                        pipe.multi()
+                        for key, order in stale:
+                            pipe.set(key, self.storage_format.encode(order))
+                        await pipe.execute()
+                        migrated += len(stale)
+                        break
+                    except WatchError:
+                        continue
+        
+        return migrated
+    
+    async def backfill_status_indexes(self, batch_size: int = 500) -> int:
+        """Add orders written before the status indexes to orders:status:<status>; returns how many were added.
+        
+        Each order is also removed from the sets of the other statuses.
+        Runs batch by batch under WATCH like migrate_storage_format, so a
+        status the projection changes meanwhile is never indexed stale.
+        """
+        backfilled = 0
+        async for keys in self._scan_batches(f"{self.key_prefix}*", batch_size):
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        await pipe.watch(*keys)
+                        orders = [decode_order(data) for data in await pipe.mget(keys) if data]
+                        pipe.multi()
+                        for order in orders:
+                            for status in OrderStatus:
+                                if status != order.status:
+                                    pipe.srem(self._status_key(status), order.id)
+                            pipe.sadd(self._status_key(order.status), order.id)
+                        results = await pipe.execute()
+                        # Each order queued one SREM per other status, then its SADD
+                        backfilled += sum(results[len(OrderStatus) - 1::len(OrderStatus)])
+                        break
+                    except WatchError:
+                        continue
+        
+        return backfilled
+    
+    async def _scan_batches(self, match: str, batch_size: int) -> AsyncIterator[list[bytes]]:
+        """Keys matching a pattern, one SCAN page at a time"""
+        cursor = 0
+        while True:
+            cursor, keys = await self.redis_client.scan(cursor, match=match, count=batch_size)
+            if keys:
+                yield keys
+            if cursor == 0:
+                break
+    
+    def _customer_key(self, customer_id: str) -> str:
+        """Sorted set of a customer's order IDs scored by created_at"""
+        return f"customer:{customer_id}:order_index"
+    
+    def _legacy_customer_key(self, customer_id: str) -> str:
+        """Unordered set of a customer's order IDs written by earlier versions"""
+        return f"customer:{customer_id}:orders"
+    
+    def _status_key(self, status: OrderStatus) -> str:
+        """Set of order IDs currently in a status"""
+        return f"orders:status:{status.value}"
\ No newline at end of file
@@ -1,11 +1,13 @@
 import asyncio
-import time
-import random
 import os
-from infrastructure.messaging import RabbitMQEventBus
+from infrastructure.messaging import create_event_bus
 from infrastructure.metrics import PrometheusMetricsCollector
 from infrastructure.redis_repository import RedisOrderRepository
+from infrastructure.cached_repository import CachedOrderRepository
 from application.service import OrderApplicationService
+from application.outbox_relay import OutboxRelay
+from application.projection import OrderStatusProjection
+from application.load_generator import LoadGenerator, LoadProfile
 
 class OrderService:
     """Order Microservice"""
@@ -13,32 +15,37 @@ class OrderService:
     def __init__(self):
         self.event_bus = None
         self.metrics = None
+        self.store = None
         self.repository = None
         self.service = None
+        self.projection = None
+        self.load_generator = None
+        self.relay = None
+        self.relay_task = None
     
     async def setup(self):
         """Setup infrastructure"""
         # Infrastructure
-        self.event_bus = RabbitMQEventBus()
+        self.event_bus = create_event_bus()
         await self.event_bus.connect()
         
         self.metrics = PrometheusMetricsCollector()
         self.metrics.start_server(8001)  # Order service on port 8001
         
-        # Setup Redis repository
-        self.repository = RedisOrderRepository()
+        # Setup Redis repository, read through an in-process order cache
+        self.store = RedisOrderRepository()
+        self.repository = CachedOrderRepository(self.store, self.metrics)
         await self.repository.connect()
         
         # Application
         self.service = OrderApplicationService(
             self.event_bus, self.metrics, self.repository
         )
-    
-    async def order_generator(self):
-        """Generate orders periodically - limited to 100 orders"""
-        for i in range(100):
-            await self.service.place_order()
-            await asyncio.sleep(random.uniform(1, 4))
+        self.load_generator = LoadGenerator(self.service, LoadProfile.from_env())
+        self.projection = OrderStatusProjection(
+            self.repository, self.metrics, on_completed=self.load_generator.record_completion
+        )
+        self.relay = OutboxRelay(self.repository, self.event_bus)
     
     async def run(self):
         """Start the order service"""
@@ -46,8 +53,28 @@ class OrderService:
         await self.setup()
         print("Order Service started on port 8001")
         
-        # Start order generator
-        asyncio.create_task(self.order_generator())
+        # Keep stored order status in step with payment and shipping results,
+        # applying each delivered batch in one repository round
+        asyncio.create_task(
+            self.event_bus.subscribe_batch(
+                'order-status', self.projection.apply_events,
+                max_batch=self.projection.batch_size, max_wait_ms=self.projection.flush_interval * 1000
+            )
+        )
+        
+        # Publish order events written to the outbox (also drains what an earlier run left)
+        self.relay_task = asyncio.create_task(self.relay.run())
+        
+        # Rewrite orders stored in another format once every replica can read the new one
+        if os.getenv('ORDER_STORAGE_MIGRATE', 'false').lower() == 'true':
+            asyncio.create_task(self.migrate_storage())
+        
+        # Move orders indexed by earlier versions into the current indexes
+        if os.getenv('ORDER_INDEX_MIGRATE', 'false').lower() == 'true':
+            asyncio.create_task(self.migrate_indexes())
+        
+        # Start load generator
+        asyncio.create_task(self.load_generator.run())
         
         # Keep service running
         try:
@@ -56,8 +83,23 @@ class OrderService:
         except KeyboardInterrupt:
             await self.cleanup()
     
+    async def migrate_storage(self):
+        """Convert stored orders to ORDER_STORAGE_FORMAT in the background"""
+        migrated = await self.store.migrate_storage_format()
+        print(f"Migrated {migrated} orders to {self.store.storage_format.name} storage")
+    
+    async def migrate_indexes(self):
+        """Rebuild indexes left by earlier versions in the background"""
+        migrated = await self.store.migrate_customer_indexes()
+        print(f"Migrated {migrated} customer order indexes")
+        backfilled = await self.store.backfill_status_indexes()
+        print(f"Added {backfilled} orders to the status indexes")
+    
     async def cleanup(self):
         """Cleanup resources"""
+        if self.relay_task:
+            self.relay_task.cancel()
+            await asyncio.gather(self.relay_task, return_exceptions=True)
         if self.event_bus:
             await self.event_bus.close()
         if self.repository:
@@ -1,6 +1,7 @@
-import json
+import asyncio
 import random
 import os
+from typing import Awaitable
 from domain.interfaces import EventBus, MetricsCollector
 from domain.events import PaymentProcessedEvent
 
@@ -11,39 +12,73 @@ class PaymentApplicationService:
         self.event_bus = event_bus
         self.metrics = metrics
         self.payment_success_rate = float(os.getenv('PAYMENT_SUCCESS_RATE', '0.9'))
+        self.min_processing_time = float(os.getenv('PAYMENT_MIN_PROCESSING_SECONDS', '0.5'))
+        self.max_processing_time = float(os.getenv('PAYMENT_MAX_PROCESSING_SECONDS', '2.0'))
+    
+    async def process_order_payments(self, orders: list[dict]) -> list[tuple[dict, Exception]]:
+        """Process a batch of orders in one gateway round; returns the orders that failed with their errors"""
+        processing_times = [random.uniform(self.min_processing_time, self.max_processing_time) for _ in orders]
+        # The simulated gateway settles a batch in the time of its slowest payment
+        await asyncio.sleep(max(processing_times, default=0))
+        
+        failed, confirms = [], []
+        for order_data, processing_time in zip(orders, processing_times):
+            try:
+                confirms.append((order_data, await self._settle_payment(order_data, processing_time)))
+            except Exception as e:
+                self.metrics.increment_payments('error')
+                failed.append((order_data, e))
         
-    def process_order_payment(self, order_data: dict):
+        # Wait for the broker to confirm every result together, not one round trip per order
+        results = await asyncio.gather(*(confirmed for _, confirmed in confirms), return_exceptions=True)
+        for (order_data, _), result in zip(confirms, results):
+            if isinstance(result, Exception):
+                self.metrics.increment_payments('error')
+                failed.append((order_data, result))
+        return failed
+    
+    async def process_order_payment(self, order_data: dict):
         """Process payment for an order"""
         try:
-            # Extract order data
-            order_id = order_data['order_id']
-            amount = order_data['value']
-            
-            # Simulate payment processing time
-            import time
-            processing_time = random.uniform(0.5, 2.0)
-            time.sleep(processing_time)
-            
-            # Simulate payment success/failure
-            success = random.random() < self.payment_success_rate
-            
-            # Create payment event
-            payment_event = PaymentProcessedEvent(
-                order_id=order_id,
-                amount=amount,
-                success=success
-            )
-            
-            # Publish payment result
-            if success:
-                self.event_bus.publish('payment.processed', payment_event.to_dict())
-                self.metrics.increment_payments('success')
-            else:
-                self.event_bus.publish('payment.failed', payment_event.to_dict())
-                self.metrics.increment_payments('failed')
-            
-            # Record processing time
-            self.metrics.record_payment_processing_time(processing_time)
-            
-        except Exception as e:
-            self.metrics.increment_payments('error')
\ No newline at end of file
+            # Simulate payment processing time without blocking the event loop
+            processing_time = random.uniform(self.min_processing_time, self.max_processing_time)
+            await asyncio.sleep(processing_time)
+            confirmed = await self._settle_payment(order_data, processing_time)
+            # Only return (and get the order acked) once the result is confirmed
+            await confirmed
+        
+        except Exception:
+            # Count it, then let the event bus schedule a retry or dead-letter the event
+            self.metrics.increment_payments('error')
+            raise
+    
+    async def _settle_payment(self, order_data: dict, processing_time: float) -> Awaitable[None]:
+        """Decide the outcome of a processed payment and publish it; returns its confirm to await"""
+        # Extract order data
+        order_id = order_data['order_id']
+        amount = order_data['value']
+        
+        # Simulate payment success/failure
+        success = random.random() < self.payment_success_rate
+        
+        # Create payment event
+        payment_event = PaymentProcessedEvent(
+            order_id=order_id,
+            amount=amount,
+            success=success
+        )
+        
+        # Publish payment result
+        if success:
+            confirm = await self.event_bus.publish('payment.processed', payment_event.to_dict(), caused_by=order_data)
+        else:
+            confirm = await self.event_bus.publish('payment.failed', payment_event.to_dict(), caused_by=order_data)
+        return self._count_when_confirmed(confirm, 'success' if success else 'failed', processing_time)
+    
+    async def _count_when_confirmed(self, confirm: Awaitable[None], status: str, processing_time: float):
+        """Wait for the broker confirm; a nack or dropped publish raises instead of being counted"""
+        await confirm
+        self.metrics.increment_payments(status)
+        
+        # Record processing time
+        self.metrics.record_payment_processing_time(processing_time)
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""PaymentApplicationService throughput on the in-memory bus: python benchmarks/bench_service.py
+
+Simulated processing time is zeroed, so this measures the service's own
+per-event cost: decode, handling, encode and routing of the result.
+BENCH_METRICS=null,prometheus also runs with the real Prometheus collector,
+so the difference is the business metrics' cost per message.
+"""
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PAYMENT_MIN_PROCESSING_SECONDS', '0')
+os.environ.setdefault('PAYMENT_MAX_PROCESSING_SECONDS', '0')
+
+from ecommerce_messaging import ConsumerConfig, InMemoryEventBus
+from application.service import PaymentApplicationService
+from domain.interfaces import MetricsCollector
+from infrastructure.metrics import PrometheusMetricsCollector
+
+class NullMetricsCollector(MetricsCollector):
+    """Discards metrics so only the service itself is measured"""
+    
+    def increment_payments(self, status: str) -> None:
+        pass
+    
+    def record_payment_processing_time(self, duration: float) -> None:
+        pass
+
+def order_placed(index: int) -> dict:
+    return {
+        'event_type': 'OrderPlaced', 'event_id': uuid.uuid4().hex, 'order_id': f"ORD-BENCH{index:09d}",
+        'customer_id': f"CUST-{index % 1000}", 'value': 123.45, 'timestamp': time.time()
+    }
+
+async def bench(codec: str, count: int, concurrency: int, batch_size: int,
+                metrics: MetricsCollector) -> tuple[float, float, dict]:
+    """Messages/sec and CPU microseconds per message draining a pre-filled queue.
+    
+    batch_size > 1 consumes through subscribe_batch with process_order_payments.
+    """
+    bus = InMemoryEventBus("Payment Service", codec=codec)
+    await bus.connect()
+    service = PaymentApplicationService(bus, metrics)
+    for index in range(count):
+        await bus.publish('order.placed', order_placed(index))
+    bus.published.clear()
+    
+    started, cpu_started = time.perf_counter(), time.process_time()
+    if batch_size > 1:
+        await bus.subscribe_batch('orders', service.process_order_payments, max_batch=batch_size,
+                                  config=ConsumerConfig(max_concurrency=concurrency))
+    else:
+        await bus.subscribe('orders', service.process_order_payment, ConsumerConfig(max_concurrency=concurrency))
+    await bus.join('orders')
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    
+    await bus.close()
+    assert bus.failed == 0, f"{bus.failed} handlers failed"
+    return count / elapsed, cpu / count * 1e6, dict(bus.published)
+
+def main():
+    count = int(os.getenv('BENCH_COUNT', '20000'))
+    concurrency = int(os.getenv('BENCH_CONCURRENCY', '10'))
+    codecs = os.getenv('BENCH_CODECS', 'json,msgpack,struct').split(',')
+    batch_sizes = [int(size) for size in os.getenv('BENCH_BATCH_SIZES', '1,100').split(',')]
+    # Prometheus metrics register globally, so one collector serves every run
+    collectors = {'null': NullMetricsCollector, 'prometheus': PrometheusMetricsCollector}
+    metrics = {name: collectors[name]() for name in os.getenv('BENCH_METRICS', 'null').split(',')}
+    
+    print(f"payment-service: {count} OrderPlaced events, concurrency {concurrency}")
+    for metrics_name, collector in metrics.items():
+        for batch_size in batch_sizes:
+            for codec in codecs:
+                rate, cpu_us, published = asyncio.run(bench(codec, count, concurrency, batch_size, collector))
+                print(f"  {metrics_name:<10} batch {batch_size:<4} {codec:<8} {rate:>10,.0f} msgs/sec "
+                      f"{cpu_us:>8.1f} us CPU/msg  published {published}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
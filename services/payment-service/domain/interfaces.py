@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Optional, Union
 
 class EventBus(ABC):
     """Domain interface for event publishing"""
@@ -10,13 +10,32 @@ class EventBus(ABC):
         pass
     
     @abstractmethod
-    def publish(self, routing_key: str, event: Any) -> None:
-        """Publish domain event"""
+    async def publish(self, routing_key: str, event: Any, caused_by: Optional[dict] = None) -> Awaitable[None]:
+        """Publish domain event.
+        
+        Awaiting the call applies backpressure; the returned awaitable
+        resolves once delivery is confirmed. caused_by is the consumed event
+        this one follows from, needed inside batch handlers.
+        """
         pass
     
     @abstractmethod
-    async def subscribe(self, queue_name: str, callback: Callable[[dict], None]) -> None:
-        """Subscribe to queue messages"""
+    async def subscribe(self, queue_name: str, callback: Callable[[dict], Union[None, Awaitable[None]]]) -> None:
+        """Subscribe to queue messages.
+        
+        Coroutine callbacks run on the event loop; sync callbacks are
+        offloaded to a bounded thread pool.
+        """
+        pass
+    
+    @abstractmethod
+    async def subscribe_batch(self, queue_name: str, handler: Callable[[list[dict]], Awaitable[Optional[list]]],
+                              max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None) -> None:
+        """Subscribe with a handler that takes a list of events.
+        
+        The handler returns (event, error) pairs for the events it failed;
+        raising fails the whole batch.
+        """
         pass
     
     @abstractmethod
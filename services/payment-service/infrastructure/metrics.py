@@ -1,4 +1,5 @@
 from prometheus_client import Counter, Histogram, start_http_server
+from ecommerce_messaging.metrics import LabelChildren
 from domain.interfaces import MetricsCollector
 
 class PrometheusMetricsCollector(MetricsCollector):
@@ -7,7 +8,15 @@ class PrometheusMetricsCollector(MetricsCollector):
     def __init__(self):
         # Business metrics
         self.payments_total = Counter('payments_total', 'Total payments', ['status'])
-        self.payment_processing_time = Histogram('payment_processing_seconds', 'Payment processing time')
+        # Simulated gateway time is PAYMENT_MIN..MAX_PROCESSING_SECONDS (0.5-2s by default)
+        self.payment_processing_time = Histogram(
+            'payment_processing_seconds', 'Payment processing time',
+            buckets=(.01, .05, .1, .25, .5, .75, 1.0, 1.25, 1.5, 1.75, 2.0, 2.5, 3.0, 5.0, 10.0)
+        )
+        # Bound once, so counting a payment is a dict lookup; series exist from the first scrape
+        self.payments_by_status = LabelChildren(self.payments_total)
+        for status in ('success', 'failed', 'error'):
+            self.payments_by_status[status]
         
     def start_server(self, port: int = 8000) -> None:
         """Start Prometheus metrics server"""
@@ -15,7 +24,7 @@ class PrometheusMetricsCollector(MetricsCollector):
         
     def increment_payments(self, status: str) -> None:
         """Increment payments counter"""
-        self.payments_total.labels(status=status).inc()
+        self.payments_by_status[status].inc()
         
     def record_payment_processing_time(self, duration: float) -> None:
         """Record payment processing time"""
@@ -1,5 +1,7 @@
 import asyncio
-from infrastructure.messaging import RabbitMQEventBus
+import os
+from ecommerce_messaging import WorkerSupervisor, is_worker, worker_processes
+from infrastructure.messaging import create_event_bus
 from infrastructure.metrics import PrometheusMetricsCollector
 from application.service import PaymentApplicationService
 
@@ -14,11 +16,13 @@ class PaymentService:
     async def setup(self):
         """Setup infrastructure"""
         # Infrastructure
-        self.event_bus = RabbitMQEventBus()
+        self.event_bus = create_event_bus()
         await self.event_bus.connect()
         
         self.metrics = PrometheusMetricsCollector()
-        self.metrics.start_server(8002)  # Payment service on port 8002
+        if not is_worker():
+            # Under WorkerSupervisor the supervisor serves every worker's metrics
+            self.metrics.start_server(8002)  # Payment service on port 8002
         
         # Application
         self.service = PaymentApplicationService(
@@ -31,16 +35,19 @@ class PaymentService:
         await self.setup()
         print("Payment Service started on port 8002")
         
-        # Start payment processing
-        asyncio.create_task(
-            self.event_bus.subscribe('orders', self.service.process_order_payment)
-        )
+        # Start payment processing, one order at a time or in batches (ORDERS_BATCH_SIZE)
+        if os.getenv('PAYMENT_BATCH_PROCESSING', 'false').lower() == 'true':
+            subscription = self.event_bus.subscribe_batch('orders', self.service.process_order_payments)
+        else:
+            subscription = self.event_bus.subscribe('orders', self.service.process_order_payment)
+        asyncio.create_task(subscription)
         
         # Keep service running
         try:
             while True:
                 await asyncio.sleep(1)
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # Cancelled when a supervised worker is told to stop
             await self.cleanup()
     
     async def cleanup(self):
@@ -54,4 +61,7 @@ async def main():
     await service.run()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if worker_processes() > 1:
+        WorkerSupervisor("Payment Service", main, worker_processes(), metrics_port=8002).run()
+    else:
+        asyncio.run(main())
\ No newline at end of file
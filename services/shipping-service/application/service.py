@@ -1,6 +1,6 @@
-import json
+import asyncio
+import os
 import random
-import time
 from domain.interfaces import EventBus, MetricsCollector
 from domain.events import OrderShippedEvent
 
@@ -10,8 +10,10 @@ class ShippingApplicationService:
     def __init__(self, event_bus: EventBus, metrics: MetricsCollector):
         self.event_bus = event_bus
         self.metrics = metrics
-        
-    def ship_order(self, payment_data: dict):
+        self.min_processing_time = float(os.getenv('SHIPPING_MIN_PROCESSING_SECONDS', '1.0'))
+        self.max_processing_time = float(os.getenv('SHIPPING_MAX_PROCESSING_SECONDS', '3.0'))
+    
+    async def ship_order(self, payment_data: dict):
         """Ship order after successful payment"""
         try:
             
@@ -21,9 +23,9 @@ class ShippingApplicationService:
             
             order_id = payment_data['order_id']
             
-            # Simulate shipping processing time
-            processing_time = random.uniform(1.0, 3.0)
-            time.sleep(processing_time)
+            # Simulate shipping processing time without blocking the event loop
+            processing_time = random.uniform(self.min_processing_time, self.max_processing_time)
+            await asyncio.sleep(processing_time)
             
             # Generate tracking number
             tracking_number = f"TRACK-{random.randint(100000, 999999)}"
@@ -34,12 +36,15 @@ class ShippingApplicationService:
                 tracking_number=tracking_number
             )
             
-            # Publish shipping event
-            self.event_bus.publish('shipping.shipped', shipping_event.to_dict())
+            # Publish shipping event, and only return (and get the payment acked) once it is confirmed
+            confirm = await self.event_bus.publish('shipping.shipped', shipping_event.to_dict())
+            await confirm
             
             # Update metrics
             self.metrics.increment_shipments('shipped')
             self.metrics.record_shipping_processing_time(processing_time)
-            
-        except Exception as e:
-            self.metrics.increment_shipments('error')
\ No newline at end of file
+        
+        except Exception:
+            # Count it, then let the event bus schedule a retry or dead-letter the event
+            self.metrics.increment_shipments('error')
+            raise
\ No newline at end of file
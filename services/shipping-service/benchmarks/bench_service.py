@@ -0,0 +1,64 @@
+"""ShippingApplicationService throughput on the in-memory bus: python benchmarks/bench_service.py
+
+Simulated processing time is zeroed, so this measures the service's own
+per-event cost: decode, handling, encode and routing of the result.
+"""
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SHIPPING_MIN_PROCESSING_SECONDS', '0')
+os.environ.setdefault('SHIPPING_MAX_PROCESSING_SECONDS', '0')
+
+from ecommerce_messaging import ConsumerConfig, InMemoryEventBus
+from application.service import ShippingApplicationService
+from domain.interfaces import MetricsCollector
+
+class NullMetricsCollector(MetricsCollector):
+    """Discards metrics so only the service itself is measured"""
+    
+    def increment_shipments(self, status: str) -> None:
+        pass
+    
+    def record_shipping_processing_time(self, duration: float) -> None:
+        pass
+
+def payment_processed(index: int) -> dict:
+    return {
+        'event_type': 'PaymentProcessed', 'event_id': uuid.uuid4().hex, 'order_id': f"ORD-BENCH{index:09d}",
+        'amount': 123.45, 'success': True, 'timestamp': time.time()
+    }
+
+async def bench(codec: str, count: int, concurrency: int) -> tuple[float, float, dict]:
+    """Messages/sec and CPU microseconds per message draining a pre-filled queue"""
+    bus = InMemoryEventBus("Shipping Service", codec=codec)
+    await bus.connect()
+    service = ShippingApplicationService(bus, NullMetricsCollector())
+    for index in range(count):
+        await bus.publish('payment.processed', payment_processed(index))
+    bus.published.clear()
+    
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await bus.subscribe('payments', service.ship_order, ConsumerConfig(max_concurrency=concurrency))
+    await bus.join('payments')
+    elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    
+    await bus.close()
+    assert bus.failed == 0, f"{bus.failed} handlers failed"
+    return count / elapsed, cpu / count * 1e6, dict(bus.published)
+
+def main():
+    count = int(os.getenv('BENCH_COUNT', '20000'))
+    concurrency = int(os.getenv('BENCH_CONCURRENCY', '10'))
+    codecs = os.getenv('BENCH_CODECS', 'json,msgpack,struct').split(',')
+    
+    print(f"shipping-service: {count} PaymentProcessed events, concurrency {concurrency}")
+    for codec in codecs:
+        rate, cpu_us, published = asyncio.run(bench(codec, count, concurrency))
+        print(f"  {codec:<8} {rate:>10,.0f} msgs/sec {cpu_us:>8.1f} us CPU/msg  published {published}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
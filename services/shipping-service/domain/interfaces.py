@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Callable
+from typing import Any, Awaitable, Callable, Union
 
 class EventBus(ABC):
     """Domain interface for event publishing"""
@@ -10,13 +10,21 @@ class EventBus(ABC):
         pass
     
     @abstractmethod
-    def publish(self, routing_key: str, event: Any) -> None:
-        """Publish domain event"""
+    async def publish(self, routing_key: str, event: Any) -> Awaitable[None]:
+        """Publish domain event.
+        
+        Awaiting the call applies backpressure; the returned awaitable
+        resolves once delivery is confirmed.
+        """
         pass
     
     @abstractmethod
-    async def subscribe(self, queue_name: str, callback: Callable[[dict], None]) -> None:
-        """Subscribe to queue messages"""
+    async def subscribe(self, queue_name: str, callback: Callable[[dict], Union[None, Awaitable[None]]]) -> None:
+        """Subscribe to queue messages.
+        
+        Coroutine callbacks run on the event loop; sync callbacks are
+        offloaded to a bounded thread pool.
+        """
         pass
     
     @abstractmethod
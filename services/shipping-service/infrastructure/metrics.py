@@ -1,4 +1,5 @@
 from prometheus_client import Counter, Histogram, start_http_server
+from ecommerce_messaging.metrics import LabelChildren
 from domain.interfaces import MetricsCollector
 
 class PrometheusMetricsCollector(MetricsCollector):
@@ -7,7 +8,15 @@ class PrometheusMetricsCollector(MetricsCollector):
     def __init__(self):
         # Business metrics
         self.shipments_total = Counter('shipments_total', 'Total shipments', ['status'])
-        self.shipping_processing_time = Histogram('shipping_processing_seconds', 'Shipping processing time')
+        # Simulated carrier time is SHIPPING_MIN..MAX_PROCESSING_SECONDS (1-3s by default)
+        self.shipping_processing_time = Histogram(
+            'shipping_processing_seconds', 'Shipping processing time',
+            buckets=(.01, .05, .1, .25, .5, 1.0, 1.25, 1.5, 1.75, 2.0, 2.25, 2.5, 2.75, 3.0, 4.0, 5.0, 10.0)
+        )
+        # Bound once, so counting a shipment is a dict lookup; series exist from the first scrape
+        self.shipments_by_status = LabelChildren(self.shipments_total)
+        for status in ('shipped', 'error'):
+            self.shipments_by_status[status]
         
     def start_server(self, port: int = 8000) -> None:
         """Start Prometheus metrics server"""
@@ -15,7 +24,7 @@ class PrometheusMetricsCollector(MetricsCollector):
         
     def increment_shipments(self, status: str) -> None:
         """Increment shipments counter"""
-        self.shipments_total.labels(status=status).inc()
+        self.shipments_by_status[status].inc()
         
     def record_shipping_processing_time(self, duration: float) -> None:
         """Record shipping processing time"""
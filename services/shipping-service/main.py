@@ -1,5 +1,6 @@
 import asyncio
-from infrastructure.messaging import RabbitMQEventBus
+from ecommerce_messaging import WorkerSupervisor, is_worker, worker_processes
+from infrastructure.messaging import create_event_bus
 from infrastructure.metrics import PrometheusMetricsCollector
 from application.service import ShippingApplicationService
 
@@ -14,11 +15,13 @@ class ShippingService:
     async def setup(self):
         """Setup infrastructure"""
         # Infrastructure
-        self.event_bus = RabbitMQEventBus()
+        self.event_bus = create_event_bus()
         await self.event_bus.connect()
         
         self.metrics = PrometheusMetricsCollector()
-        self.metrics.start_server(8003)  # Shipping service on port 8003
+        if not is_worker():
+            # Under WorkerSupervisor the supervisor serves every worker's metrics
+            self.metrics.start_server(8003)  # Shipping service on port 8003
         
         # Application
         self.service = ShippingApplicationService(
@@ -40,7 +43,8 @@ class ShippingService:
         try:
             while True:
                 await asyncio.sleep(1)
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # Cancelled when a supervised worker is told to stop
             await self.cleanup()
     
     async def cleanup(self):
@@ -54,4 +58,7 @@ async def main():
     await service.run()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if worker_processes() > 1:
+        WorkerSupervisor("Shipping Service", main, worker_processes(), metrics_port=8003).run()
+    else:
+        asyncio.run(main())
\ No newline at end of file
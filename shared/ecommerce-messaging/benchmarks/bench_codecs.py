@@ -0,0 +1,45 @@
+"""Wire size and encode/decode cost per event codec: python benchmarks/bench_codecs.py"""
+import os
+import sys
+import time
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ecommerce_messaging.codecs import CodecRegistry
+
+EVENTS = {
+    'OrderPlaced': {
+        'event_type': 'OrderPlaced', 'event_id': uuid.uuid4().hex, 'order_id': 'ORD-02J5PWW1T011KY',
+        'customer_id': 'CUST-421', 'value': 123.45, 'timestamp': time.time()
+    },
+    'PaymentProcessed': {
+        'event_type': 'PaymentProcessed', 'event_id': uuid.uuid4().hex, 'order_id': 'ORD-02J5PWW1T011KY',
+        'amount': 123.45, 'success': True, 'timestamp': time.time()
+    },
+    'OrderShipped': {
+        'event_type': 'OrderShipped', 'event_id': uuid.uuid4().hex, 'order_id': 'ORD-02J5PWW1T011KY',
+        'tracking_number': 'TRACK-123456', 'timestamp': time.time()
+    }
+}
+
+def per_call_us(fn, number: int) -> float:
+    """Best-of-5 microseconds per call"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+def main():
+    number = int(os.getenv('BENCH_COUNT', '100000'))
+    registry = CodecRegistry()
+    
+    print(f"{'event':<18}{'codec':<10}{'bytes':>7}{'encode us':>12}{'decode us':>12}")
+    for event_type, event in EVENTS.items():
+        for name, codec in registry.codecs.items():
+            body = codec.encode(event)
+            assert codec.decode(body) == event, f"{name} round trip failed"
+            encode_us = per_call_us(lambda: codec.encode(event), number)
+            decode_us = per_call_us(lambda: codec.decode(body), number)
+            print(f"{event_type:<18}{name:<10}{len(body):>7}{encode_us:>12.2f}{decode_us:>12.2f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
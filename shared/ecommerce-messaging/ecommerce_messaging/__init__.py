@@ -0,0 +1,24 @@
+"""Shared messaging infrastructure for the e-commerce services"""
+from .base import BaseEventBus
+from .bus import RabbitMQEventBus
+from .channels import ChannelPool
+from .codecs import CodecRegistry, EventCodec, JsonCodec, MsgpackCodec, StructEventCodec
+from .consumer import BatchAccumulator, ConsumerConfig, ConsumerScheduler
+from .dedup import EventDeduplicator, EventInProgressException, LocalDedupCache
+from .memory import InMemoryEventBus
+from .publisher import ConfirmingPublisher, PublishBufferFullException
+from .streams import RedisStreamsEventBus, event_bus_backend
+from .supervisor import WorkerSupervisor, is_worker, worker_processes
+from .topology import QueueSpec, RetryPolicy, Topology, DEFAULT_RETRY, ECOMMERCE_TOPOLOGY
+from .tracing import TraceContext, current_trace, trace_of
+
+__all__ = [
+    'BaseEventBus', 'RabbitMQEventBus', 'RedisStreamsEventBus', 'InMemoryEventBus', 'event_bus_backend',
+    'CodecRegistry', 'EventCodec', 'JsonCodec', 'MsgpackCodec', 'StructEventCodec',
+    'BatchAccumulator', 'ConsumerConfig', 'ConsumerScheduler',
+    'EventDeduplicator', 'EventInProgressException', 'LocalDedupCache',
+    'ChannelPool', 'ConfirmingPublisher', 'PublishBufferFullException',
+    'WorkerSupervisor', 'is_worker', 'worker_processes',
+    'QueueSpec', 'RetryPolicy', 'Topology', 'DEFAULT_RETRY', 'ECOMMERCE_TOPOLOGY',
+    'TraceContext', 'current_trace', 'trace_of'
+]
\ No newline at end of file
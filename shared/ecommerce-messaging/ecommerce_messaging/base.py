@@ -0,0 +1,197 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from .codecs import CodecRegistry, SCHEMA_VERSION, SCHEMA_VERSION_HEADER
+from .consumer import ConsumerConfig
+from .dedup import CLAIMED, IN_PROGRESS, EventDeduplicator
+from .metrics import BatchMetrics, ConsumerMetrics, DedupMetrics, FailureMetrics, PublisherMetrics, TracingMetrics
+from .monitoring import event_loop_lag_interval, poll_interval, poll_queue_depths, sample_event_loop_lag
+from .topology import Topology, ECOMMERCE_TOPOLOGY
+from .tracing import TraceContext, batch_traces, current_trace, trace_of
+
+class BaseEventBus:
+    """Transport-independent half of an event bus: encoding, tracing, dedup and running handlers.
+    
+    Subclasses move bytes and settle deliveries. A delivery is anything with
+    message_id, body, content_type and headers (an aio-pika IncomingMessage,
+    a StreamEntry); _handle_delivery and _handle_batch run handlers on them
+    and report what happened, and the transport acks, retries or
+    dead-letters accordingly.
+    """
+    
+    def __init__(self, service_name: str, topology: Topology = ECOMMERCE_TOPOLOGY,
+                 consumers: Optional[dict[str, ConsumerConfig]] = None):
+        self.service_name = service_name
+        self.topology = topology
+        self.consumers = consumers or {}
+        self.codecs = CodecRegistry(os.getenv('EVENT_CODEC', 'json'))
+        self.publisher_metrics = PublisherMetrics()
+        self.tracing_metrics = TracingMetrics()
+        self.dedup = EventDeduplicator(DedupMetrics())
+        self.failure_metrics = FailureMetrics()
+        self.batch_metrics = BatchMetrics()
+        self.consumer_metrics = ConsumerMetrics()
+        self.consumed_queues: set[str] = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # Bounded pool for sync callbacks so they never block the event loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('HANDLER_THREAD_POOL_SIZE', '8')),
+            thread_name_prefix='event-handler'
+        )
+    
+    def _start_monitoring(self) -> list[asyncio.Task]:
+        """Tasks sampling the backlog of the queues we consume, and how late the event loop runs"""
+        return [
+            asyncio.create_task(poll_queue_depths(
+                self.consumer_metrics, self.consumed_queues, self._queue_depth, poll_interval(), self.service_name
+            )),
+            asyncio.create_task(sample_event_loop_lag(
+                self.consumer_metrics, event_loop_lag_interval(), poll_interval()
+            ))
+        ]
+    
+    async def _queue_depth(self, queue_name: str) -> tuple[int, int]:
+        """Messages waiting in a queue and its consumers"""
+        raise NotImplementedError
+    
+    def _publish_trace(self, caused_by: Optional[dict], trace_headers: Optional[dict]) -> Optional[TraceContext]:
+        """Trace named by publish()'s caused_by or trace_headers; None continues the current one"""
+        return trace_of(caused_by) or TraceContext.from_headers(trace_headers)[0]
+    
+    def current_trace_headers(self) -> dict:
+        """Headers of the trace a publish would continue now, to store with an event published later"""
+        return (current_trace.get() or TraceContext.start()).to_headers(time.time())
+    
+    def _encode(self, routing_key: str, event: Any, trace: Optional[TraceContext] = None) -> tuple[bytes, str, Optional[str], dict]:
+        """Body, content type, message ID and headers of an event published now"""
+        body, content_type = self.codecs.encode(event)
+        
+        # Continue the trace of the message being handled, or start a new one
+        trace = trace or current_trace.get() or TraceContext.start()
+        published_at = time.time()
+        self.tracing_metrics.record_pipeline_latency(routing_key, published_at - trace.origin_ts)
+        
+        message_id = event.get('event_id') if isinstance(event, dict) else None
+        return body, content_type, message_id, {SCHEMA_VERSION_HEADER: SCHEMA_VERSION, **trace.to_headers(published_at)}
+    
+    def publish_threadsafe(self, routing_key: str, event: Any, caused_by: Optional[dict] = None) -> concurrent.futures.Future:
+        """Publish from a sync handler thread; the future resolves once the publish is confirmed"""
+        trace = trace_of(caused_by) or current_trace.get()
+        return asyncio.run_coroutine_threadsafe(self._publish_and_wait(routing_key, event, trace), self.loop)
+    
+    async def _publish_and_wait(self, routing_key: str, event: Any, trace: Optional[TraceContext]):
+        """Publish from the event loop on behalf of another thread"""
+        current_trace.set(trace)
+        confirm = await self.publish(routing_key, event)
+        await confirm
+    
+    async def _call(self, callback: Callable, data: Any) -> Any:
+        """Run a coroutine callback, or a sync one in the handler thread pool keeping the trace"""
+        if asyncio.iscoroutinefunction(callback):
+            return await callback(data)
+        context = contextvars.copy_context()
+        return await self.loop.run_in_executor(self.executor, context.run, callback, data)
+    
+    async def _handle_delivery(self, queue_name: str, delivery, callback: Callable) -> str:
+        """Claim, decode and handle one delivery.
+        
+        Returns the dedup outcome: CLAIMED once the callback succeeded,
+        DUPLICATE for an event already handled, IN_PROGRESS for one another
+        consumer holds; the callback didn't run for the last two. A failing
+        callback releases the claim and its error propagates.
+        """
+        event_id = delivery.message_id
+        if event_id:
+            outcome = await self.dedup.claim(queue_name, event_id)
+            if outcome != CLAIMED:
+                return outcome
+        
+        dequeued_at = time.time()
+        trace, published_at = TraceContext.from_headers(delivery.headers)
+        if published_at is not None:
+            self.tracing_metrics.record_queue_wait(queue_name, dequeued_at - published_at)
+        # Events published by the callback continue this trace
+        current_trace.set((trace or TraceContext.start()).with_hop(
+            self.service_name, queue_name, published_at, dequeued_at
+        ))
+        
+        try:
+            data = self.codecs.decode(delivery.body, delivery.content_type)
+            with self.consumer_metrics.handlers_in_flight(queue_name).track_inprogress():
+                await self._call(callback, data)
+        except BaseException:
+            if event_id:
+                # Let a retry of this event run again
+                await self.dedup.release(queue_name, event_id)
+            raise
+        else:
+            if event_id:
+                await self.dedup.complete(queue_name, event_id)
+        finally:
+            self.tracing_metrics.record_processing_time(queue_name, time.time() - dequeued_at)
+        return CLAIMED
+    
+    async def _handle_batch(self, queue_name: str, deliveries: list, handler: Callable) -> tuple[dict[int, Exception], set[int]]:
+        """Claim, decode and handle a batch of deliveries with one handler call.
+        
+        Returns the positions that failed with their errors, and those whose
+        event another consumer holds; every other delivery was handled or is
+        a duplicate and can be acked. A raising handler, or one returning
+        objects it wasn't given, fails every event it got.
+        """
+        started = time.time()
+        claimed = await self.dedup.claim_many(queue_name, [delivery.message_id for delivery in deliveries])
+        _, published_at = TraceContext.from_headers(deliveries[0].headers)
+        if published_at is not None:
+            # Oldest delivery only: the batch waited at least this long
+            self.tracing_metrics.record_queue_wait(queue_name, started - published_at)
+        
+        events, traces, positions, failures = [], {}, {}, {}
+        in_progress = {index for index, outcome in enumerate(claimed) if outcome == IN_PROGRESS}
+        for index, delivery in enumerate(deliveries):
+            if claimed[index] != CLAIMED:
+                continue
+            try:
+                event = self.codecs.decode(delivery.body, delivery.content_type)
+            except Exception as e:
+                failures[index] = e
+                continue
+            trace, delivery_published_at = TraceContext.from_headers(delivery.headers)
+            traces[id(event)] = (trace or TraceContext.start()).with_hop(
+                self.service_name, queue_name, delivery_published_at, started
+            )
+            positions[id(event)] = index
+            events.append(event)
+        
+        if events:
+            # Publishes name the event they follow from (caused_by) to continue its trace
+            batch_traces.set(traces)
+            current_trace.set(None)
+            try:
+                with self.consumer_metrics.handlers_in_flight(queue_name).track_inprogress():
+                    failed = await self._call(handler, events) or []
+            except Exception as e:
+                failed = [(event, e) for event in events]
+            finally:
+                self.batch_metrics.record_batch(queue_name, len(events), time.time() - started)
+            
+            if any(id(event) not in positions for event, _ in failed):
+                # Not the objects it was given (e.g. copies): no telling which deliveries failed
+                error = ValueError(f"Batch handler for '{queue_name}' returned events it wasn't given")
+                failed = [(event, error) for event in events]
+            failures.update((positions[id(event)], error) for event, error in failed)
+        
+        await self.dedup.complete_many(queue_name, [
+            deliveries[index].message_id for index in positions.values() if index not in failures
+        ])
+        await self.dedup.release_many(queue_name, [deliveries[index].message_id for index in failures])
+        return failures, in_progress
+    
+    async def _close_handlers(self):
+        """Release what running handlers needed: the dedup store and the thread pool"""
+        await self.dedup.close()
+        self.executor.shutdown(wait=False)
\ No newline at end of file
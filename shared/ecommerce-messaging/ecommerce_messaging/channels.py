@@ -0,0 +1,83 @@
+import os
+from typing import Optional
+import aio_pika
+
+class ChannelPool:
+    """Publisher and consumer channels on one connection.
+    
+    Publishes rotate over a fixed set of confirm-mode channels. They never
+    queue behind deliveries, and a channel-level error only takes out one of
+    them. Each consumed queue gets a dedicated channel with its own prefetch.
+    
+    Health policy: robust channels reopen themselves after a channel or
+    connection error and restore their qos and consumers. While a publisher
+    channel is closed the rotation skips it. If every publisher channel is
+    closed, the next one in turn is replaced with a fresh channel.
+    """
+    
+    def __init__(self, connection: aio_pika.abc.AbstractConnection, exchange_name: str, metrics,
+                 publisher_channels: Optional[int] = None):
+        self.connection = connection
+        self.exchange_name = exchange_name
+        self.metrics = metrics
+        self.size = publisher_channels or int(os.getenv('PUBLISH_CHANNELS', '4'))
+        if self.size < 1:
+            raise ValueError("publisher_channels must be positive")
+        self.publishers: list[tuple[aio_pika.abc.AbstractChannel, aio_pika.abc.AbstractExchange]] = []
+        self.consumers: dict[str, aio_pika.abc.AbstractChannel] = {}
+        self.next = 0
+    
+    async def start(self):
+        """Open the publisher channels"""
+        self.publishers = [await self._open_publisher() for _ in range(self.size)]
+    
+    async def _open_publisher(self) -> tuple[aio_pika.abc.AbstractChannel, aio_pika.abc.AbstractExchange]:
+        """Open a confirm-mode channel and bind the exchange handle to it"""
+        channel = await self._open_channel('publish', publisher_confirms=True)
+        exchange = await channel.get_exchange(self.exchange_name, ensure=False)
+        return channel, exchange
+    
+    async def _open_channel(self, role: str, publisher_confirms: bool) -> aio_pika.abc.AbstractChannel:
+        """Open a channel and count its automatic recoveries"""
+        channel = await self.connection.channel(publisher_confirms=publisher_confirms)
+        if hasattr(channel, 'reopen_callbacks'):
+            channel.reopen_callbacks.add(lambda _: self.metrics.increment_channel_recovery(role))
+        return channel
+    
+    async def exchange(self) -> aio_pika.abc.AbstractExchange:
+        """Exchange bound to the next open publisher channel, round-robin"""
+        return self.publishers[await self._next_open()][1]
+    
+    async def default_exchange(self) -> aio_pika.abc.AbstractExchange:
+        """Default exchange (routes straight to a queue by name) on the next open publisher channel"""
+        return self.publishers[await self._next_open()][0].default_exchange
+    
+    async def _next_open(self) -> int:
+        """Index of the next open publisher channel"""
+        for _ in range(self.size):
+            index = self.next
+            self.next = (index + 1) % self.size
+            if not self.publishers[index][0].is_closed:
+                return index
+        
+        # Every channel is down; don't wait for them to recover on their own
+        index = self.next
+        self.next = (index + 1) % self.size
+        self.publishers[index] = await self._open_publisher()
+        self.metrics.increment_channel_recovery('publish')
+        return index
+    
+    async def consumer_channel(self, queue_name: str, prefetch_count: int) -> aio_pika.abc.AbstractChannel:
+        """Dedicated channel for consuming a queue, opened on first use"""
+        channel = self.consumers.get(queue_name)
+        if channel is None or channel.is_closed:
+            channel = self.consumers[queue_name] = await self._open_channel('consume', publisher_confirms=False)
+        await channel.set_qos(prefetch_count=prefetch_count)
+        return channel
+    
+    async def close(self):
+        """Close every channel in the pool"""
+        channels = [channel for channel, _ in self.publishers] + list(self.consumers.values())
+        for channel in channels:
+            if not channel.is_closed:
+                await channel.close()
\ No newline at end of file
@@ -0,0 +1,156 @@
+import json
+import struct
+from abc import ABC, abstractmethod
+from typing import Optional
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+SCHEMA_VERSION = 2
+SCHEMA_VERSION_HEADER = 'x-schema-version'
+
+class EventCodec(ABC):
+    """Serializes event dicts to message bodies"""
+    
+    content_type = ''
+    
+    @abstractmethod
+    def encode(self, event: dict) -> bytes:
+        """Encode event; raises ValueError if the event cannot be represented"""
+        pass
+    
+    @abstractmethod
+    def decode(self, body: bytes) -> dict:
+        """Decode message body"""
+        pass
+
+class JsonCodec(EventCodec):
+    """Plain JSON, the universal fallback"""
+    
+    content_type = 'application/json'
+    
+    def encode(self, event: dict) -> bytes:
+        return json.dumps(event, separators=(',', ':')).encode()
+    
+    def decode(self, body: bytes) -> dict:
+        return json.loads(body)
+
+class MsgpackCodec(EventCodec):
+    """MessagePack, schemaless but compact"""
+    
+    content_type = 'application/msgpack'
+    
+    def encode(self, event: dict) -> bytes:
+        return msgpack.packb(event, use_bin_type=True)
+    
+    def decode(self, body: bytes) -> dict:
+        return msgpack.unpackb(body, raw=False)
+
+class StructEventCodec(EventCodec):
+    """Struct-packed fixed schemas for the known domain events.
+    
+    Layout: schema version and event type id (one byte each), the fixed-size
+    fields in schema order, one uint16 length per string field, then the
+    UTF-8 string bytes. Bodies in older schema versions still decode.
+    """
+    
+    content_type = 'application/x-ecommerce-event'
+    
+    # schema version -> event type id -> (event_type, [(field, kind)]); kind is 's' (str),
+    # 'd' (float), '?' (bool) or 'u' (UUID hex string, packed as 16 bytes)
+    SCHEMAS = {
+        1: {
+            1: ('OrderPlaced', [('order_id', 's'), ('customer_id', 's'), ('value', 'd'), ('timestamp', 'd')]),
+            2: ('PaymentProcessed', [('order_id', 's'), ('amount', 'd'), ('success', '?'), ('timestamp', 'd')]),
+            3: ('OrderShipped', [('order_id', 's'), ('tracking_number', 's'), ('timestamp', 'd')])
+        },
+        # Version 2 adds event_id for consumer-side deduplication
+        2: {
+            1: ('OrderPlaced', [('event_id', 'u'), ('order_id', 's'), ('customer_id', 's'),
+                                ('value', 'd'), ('timestamp', 'd')]),
+            2: ('PaymentProcessed', [('event_id', 'u'), ('order_id', 's'), ('amount', 'd'),
+                                     ('success', '?'), ('timestamp', 'd')]),
+            3: ('OrderShipped', [('event_id', 'u'), ('order_id', 's'), ('tracking_number', 's'), ('timestamp', 'd')])
+        }
+    }
+    
+    def __init__(self):
+        self.layouts = {}
+        self.type_ids = {}
+        for version, schemas in self.SCHEMAS.items():
+            for type_id, (event_type, fields) in schemas.items():
+                fixed = [name for name, kind in fields if kind != 's']
+                strings = [name for name, kind in fields if kind == 's']
+                uuids = {name for name, kind in fields if kind == 'u'}
+                kinds = ''.join('16s' if kind == 'u' else kind for _, kind in fields if kind != 's')
+                packer = struct.Struct('>BB' + kinds + 'H' * len(strings))
+                keys = {'event_type', *fixed, *strings}
+                self.layouts[version, type_id] = (event_type, packer, fixed, strings, uuids, keys)
+                if version == SCHEMA_VERSION:
+                    self.type_ids[event_type] = type_id
+    
+    def encode(self, event: dict) -> bytes:
+        type_id = self.type_ids.get(event.get('event_type'))
+        if type_id is None:
+            raise ValueError(f"No binary schema for {event.get('event_type')!r}")
+        _, packer, fixed, strings, uuids, keys = self.layouts[SCHEMA_VERSION, type_id]
+        if event.keys() != keys:
+            raise ValueError(f"Event fields do not match schema {event.get('event_type')!r}")
+        
+        try:
+            encoded = [event[name].encode() for name in strings]
+            values = [bytes.fromhex(event[name]) if name in uuids else event[name] for name in fixed]
+            if any(len(event[name]) != 32 for name in uuids):
+                raise ValueError("UUID fields must be 32 hex digits")
+            header = packer.pack(SCHEMA_VERSION, type_id, *values, *(len(s) for s in encoded))
+        except (AttributeError, TypeError, struct.error) as e:
+            raise ValueError(f"Event does not fit schema {event['event_type']!r}: {e}") from e
+        return b''.join((header, *encoded))
+    
+    def decode(self, body: bytes) -> dict:
+        layout = self.layouts.get((body[0], body[1]))
+        if layout is None:
+            raise ValueError(f"Unsupported schema version {body[0]} or event type {body[1]}")
+        event_type, packer, fixed, strings, uuids, _ = layout
+        
+        values = packer.unpack_from(body)
+        event = {'event_type': event_type}
+        event.update(zip(fixed, values[2:2 + len(fixed)]))
+        for name in uuids:
+            event[name] = event[name].hex()
+        
+        offset = packer.size
+        for name, length in zip(strings, values[2 + len(fixed):]):
+            event[name] = body[offset:offset + length].decode()
+            offset += length
+        return event
+
+class CodecRegistry:
+    """Picks the encoder for outgoing events and decodes by AMQP content_type"""
+    
+    def __init__(self, preferred: str = 'json'):
+        self.json = JsonCodec()
+        self.codecs = {
+            'json': self.json,
+            'struct': StructEventCodec()
+        }
+        if msgpack is not None:
+            self.codecs['msgpack'] = MsgpackCodec()
+        if preferred not in self.codecs:
+            raise ValueError(f"Unknown or unavailable codec: {preferred}")
+        
+        self.preferred = self.codecs[preferred]
+        self.by_content_type = {codec.content_type: codec for codec in self.codecs.values()}
+    
+    def encode(self, event: dict) -> tuple[bytes, str]:
+        """Encode with the preferred codec, falling back to JSON"""
+        try:
+            return self.preferred.encode(event), self.preferred.content_type
+        except (ValueError, TypeError):
+            return self.json.encode(event), self.json.content_type
+    
+    def decode(self, body: bytes, content_type: Optional[str]) -> dict:
+        """Decode using the codec matching content_type; JSON when unset or unknown"""
+        return self.by_content_type.get(content_type, self.json).decode(body)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Optional, Union
+
+class ConsumerConfig:
+    """Per-queue consumer settings"""
+    
+    def __init__(self, prefetch_count: int = 10, max_concurrency: int = 10, ack_after_processing: bool = True,
+                 stream_offset: Union[str, int] = 'next', max_batch: int = 100, max_wait_ms: float = 10):
+        if prefetch_count < 1 or max_concurrency < 1 or max_batch < 1:
+            raise ValueError("prefetch_count, max_concurrency and max_batch must be positive")
+        self.prefetch_count = prefetch_count
+        self.max_concurrency = max_concurrency
+        self.ack_after_processing = ack_after_processing
+        # Batch size and wait for subscribe_batch; max_concurrency then counts batches
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        # Where a stream queue consumer starts: 'first', 'last', 'next' or a numeric offset
+        self.stream_offset = stream_offset
+    
+    @classmethod
+    def from_env(cls, queue_name: str) -> 'ConsumerConfig':
+        """Load settings for a queue, e.g. ORDERS_PREFETCH_COUNT, falling back to CONSUMER_PREFETCH_COUNT.
+        
+        The prefetch count is the budget for the whole service: each of the
+        WORKER_COUNT processes started by WorkerSupervisor takes an equal share.
+        """
+        prefix = queue_name.upper().replace('-', '_')
+        
+        def setting(name: str, default: str) -> str:
+            return os.getenv(f'{prefix}_{name}', os.getenv(f'CONSUMER_{name}', default))
+        
+        workers = int(os.getenv('WORKER_COUNT', '1'))
+        stream_offset = os.getenv(f'{prefix}_STREAM_OFFSET', 'next')
+        return cls(
+            prefetch_count=max(1, int(setting('PREFETCH_COUNT', '10')) // workers),
+            max_concurrency=int(setting('MAX_CONCURRENCY', '10')),
+            ack_after_processing=setting('ACK_AFTER_PROCESSING', 'true').lower() == 'true',
+            stream_offset=int(stream_offset) if stream_offset.isdigit() else stream_offset,
+            max_batch=int(setting('BATCH_SIZE', '100')),
+            max_wait_ms=float(setting('BATCH_WAIT_MS', '10'))
+        )
+
+class ConsumerScheduler:
+    """Semaphore-backed scheduler that bounds in-flight handlers"""
+    
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+    
+    async def run(self, handler: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run handler once a worker slot is free"""
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                return await handler(*args)
+            finally:
+                self.in_flight -= 1
+
+class BatchAccumulator:
+    """Collects items until max_batch arrived or max_wait seconds passed since the first one"""
+    
+    def __init__(self, max_batch: int, max_wait: float, flush: Callable[[list], None]):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.flush = flush
+        self.pending = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+    
+    def add(self, item: Any):
+        """Queue an item, flushing when the batch is full"""
+        self.pending.append(item)
+        if len(self.pending) >= self.max_batch:
+            self.flush_now()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.max_wait, self.flush_now)
+    
+    def flush_now(self):
+        """Hand everything queued so far to flush"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        self.flush(batch)
\ No newline at end of file
@@ -0,0 +1,229 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional dependency
+    redis = None
+
+# Outcomes of EventDeduplicator.claim
+CLAIMED = 'claimed'
+DUPLICATE = 'duplicate'
+IN_PROGRESS = 'in_progress'
+
+# Values of the Redis dedup keys: a lease while a handler runs, then the processed marker
+LEASE_VALUE = b'processing'
+DONE_VALUE = b'done'
+
+class EventInProgressException(Exception):
+    """Another consumer holds the lease on this event; try the delivery again later"""
+
+class LocalDedupCache:
+    """In-process LRU of recently handled event IDs, each kept for at most ttl seconds"""
+    
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[str, float] = OrderedDict()
+    
+    def seen(self, event_id: str) -> bool:
+        """True if the event ID was added and hasn't expired"""
+        expires_at = self.entries.get(event_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self.entries[event_id]
+            return False
+        self.entries.move_to_end(event_id)
+        return True
+    
+    def add(self, event_id: str) -> None:
+        self.entries[event_id] = time.monotonic() + self.ttl
+        self.entries.move_to_end(event_id)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+    
+    def discard(self, event_id: str) -> None:
+        self.entries.pop(event_id, None)
+
+class EventDeduplicator:
+    """Skips redeliveries of events that were already handled.
+    
+    Claims are per queue, since one event is routed to several queues. A
+    claim takes a short lease on the event, renewed while its handler
+    runs; complete() replaces the lease with a processed marker kept for
+    ttl seconds, and release() drops it after a failure so a retry still
+    runs. A redelivery that finds the marker is a duplicate; one that finds
+    only a lease is in progress elsewhere and must be tried again later,
+    and if the holder died its lease runs out within lease seconds.
+    
+    The in-process LRU answers repeats of events this process handled
+    without a round trip. With a Redis URL, the keys extend the window
+    across processes and restarts.
+    """
+    
+    def __init__(self, metrics, max_size: Optional[int] = None, ttl: Optional[float] = None,
+                 redis_url: Optional[str] = None, lease: Optional[float] = None):
+        self.metrics = metrics
+        self.ttl = ttl or float(os.getenv('DEDUP_TTL_SECONDS', '3600'))
+        self.lease = lease or float(os.getenv('DEDUP_LEASE_SECONDS', '30'))
+        self.local = LocalDedupCache(max_size or int(os.getenv('DEDUP_CACHE_SIZE', '100000')), self.ttl)
+        self.redis_url = redis_url or os.getenv('DEDUP_REDIS_URL')
+        self.redis_client = None
+        self.key_prefix = "dedup:"
+        # Events this process holds a lease on, i.e. whose handler is running
+        self.leases: set[str] = set()
+        self.renew_task: Optional[asyncio.Task] = None
+    
+    async def connect(self):
+        """Connect to Redis if a dedup URL is configured"""
+        if not self.redis_url:
+            return
+        if redis is None:
+            raise RuntimeError("DEDUP_REDIS_URL is set but the redis package is not installed")
+        self.redis_client = redis.from_url(self.redis_url)
+        self.renew_task = asyncio.create_task(self._renew_leases())
+    
+    async def _renew_leases(self):
+        """Extend the leases of running handlers three times per lease period"""
+        lease_ms = int(self.lease * 1000)
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            keys = list(self.leases)
+            if not keys:
+                continue
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        # GT: never shortens the processed marker a handler finished with meanwhile
+                        pipe.pexpire(f"{self.key_prefix}{key}", lease_ms, gt=True)
+                    await pipe.execute()
+            except Exception as e:
+                print(f"Dedup lease renewal for {len(keys)} events failed: {e!r}")
+    
+    def _claim_locally(self, queue: str, key: str) -> Optional[str]:
+        """Outcome known without Redis, or None"""
+        if self.local.seen(key):
+            self.metrics.record_dedup(queue, 'hit_local')
+            return DUPLICATE
+        if key in self.leases:
+            self.metrics.record_dedup(queue, 'in_progress')
+            return IN_PROGRESS
+        return None
+    
+    def _claim_result(self, queue: str, key: str, leased: bool, value: Optional[bytes]) -> str:
+        """Outcome of SET NX of the lease and GET of the value it found"""
+        if leased:
+            self.leases.add(key)
+            self.metrics.record_dedup(queue, 'miss')
+            return CLAIMED
+        if value == LEASE_VALUE or value is None:
+            # Held by a running handler, or its lease ran out just now; look again later
+            self.metrics.record_dedup(queue, 'in_progress')
+            return IN_PROGRESS
+        self.local.add(key)
+        self.metrics.record_dedup(queue, 'hit_redis')
+        return DUPLICATE
+    
+    async def claim(self, queue: str, event_id: str) -> str:
+        """CLAIMED if the caller should handle the event, DUPLICATE if it was handled, IN_PROGRESS if it's being handled"""
+        key = f"{queue}:{event_id}"
+        outcome = self._claim_locally(queue, key)
+        if outcome is not None:
+            return outcome
+        
+        if self.redis_client is not None:
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.set(f"{self.key_prefix}{key}", LEASE_VALUE, nx=True, px=int(self.lease * 1000))
+                    pipe.get(f"{self.key_prefix}{key}")
+                    leased, value = await pipe.execute()
+            except Exception as e:
+                # Redis being down shouldn't stop consumption; fall back to the local window
+                print(f"Dedup check for {key} failed: {e!r}")
+                leased, value = True, None
+            return self._claim_result(queue, key, leased, value)
+        
+        return self._claim_result(queue, key, True, None)
+    
+    async def claim_many(self, queue: str, event_ids: list[Optional[str]]) -> list[str]:
+        """claim() for a batch with one Redis round trip; events without an ID are always claimed"""
+        keys = [f"{queue}:{event_id}" if event_id else None for event_id in event_ids]
+        outcomes = [CLAIMED] * len(keys)
+        pending, pending_keys = [], set()
+        for index, key in enumerate(keys):
+            if key is None:
+                continue
+            outcome = self._claim_locally(queue, key)
+            if outcome is not None:
+                outcomes[index] = outcome
+            elif key in pending_keys:
+                # The same event twice in one batch: the first copy's outcome settles both
+                self.metrics.record_dedup(queue, 'hit_local')
+                outcomes[index] = DUPLICATE
+            else:
+                pending.append(index)
+                pending_keys.add(key)
+        
+        if not pending:
+            return outcomes
+        results = [(True, None)] * len(pending)
+        if self.redis_client is not None:
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for index in pending:
+                        pipe.set(f"{self.key_prefix}{keys[index]}", LEASE_VALUE, nx=True, px=int(self.lease * 1000))
+                        pipe.get(f"{self.key_prefix}{keys[index]}")
+                    replies = await pipe.execute()
+                results = list(zip(replies[::2], replies[1::2]))
+            except Exception as e:
+                print(f"Dedup check for {len(pending)} events on {queue} failed: {e!r}")
+        for index, (leased, value) in zip(pending, results):
+            outcomes[index] = self._claim_result(queue, keys[index], leased, value)
+        return outcomes
+    
+    async def complete(self, queue: str, event_id: str):
+        """Record that the handler succeeded, so redeliveries are skipped for ttl seconds"""
+        await self.complete_many(queue, [event_id])
+    
+    async def complete_many(self, queue: str, event_ids: list[Optional[str]]):
+        """complete() for a batch with one Redis round trip"""
+        keys = [f"{queue}:{event_id}" for event_id in event_ids if event_id]
+        for key in keys:
+            self.leases.discard(key)
+            self.local.add(key)
+        if self.redis_client is not None and keys:
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.set(f"{self.key_prefix}{key}", DONE_VALUE, ex=max(1, int(self.ttl)))
+                    await pipe.execute()
+            except Exception as e:
+                # Only other processes miss the marker; their redelivery runs the handler again
+                print(f"Dedup completion for {len(keys)} events on {queue} failed: {e!r}")
+    
+    async def release(self, queue: str, event_id: str):
+        """Drop the lease after the handler failed"""
+        await self.release_many(queue, [event_id])
+    
+    async def release_many(self, queue: str, event_ids: list[Optional[str]]):
+        """release() for a batch with one Redis round trip"""
+        keys = [f"{queue}:{event_id}" for event_id in event_ids if event_id]
+        for key in keys:
+            self.leases.discard(key)
+        if self.redis_client is not None and keys:
+            try:
+                await self.redis_client.delete(*(f"{self.key_prefix}{key}" for key in keys))
+            except Exception as e:
+                print(f"Dedup release for {len(keys)} events on {queue} failed: {e!r}")
+    
+    async def close(self):
+        """Stop renewing leases and close the Redis connection"""
+        if self.renew_task is not None:
+            self.renew_task.cancel()
+            await asyncio.gather(self.renew_task, return_exceptions=True)
+        if self.redis_client is not None:
+            await self.redis_client.close()
\ No newline at end of file
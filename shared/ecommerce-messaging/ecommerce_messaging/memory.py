@@ -0,0 +1,159 @@
+import asyncio
+import concurrent.futures
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, Union
+from .codecs import CodecRegistry
+from .consumer import ConsumerConfig
+from .topology import Topology, ECOMMERCE_TOPOLOGY
+
+class InMemoryEventBus:
+    """Broker-less event bus with the same interface as RabbitMQEventBus.
+    
+    Events are encoded with the configured codec and routed through the
+    topology's topic bindings into one asyncio queue per declared queue, so
+    handlers receive exactly what RabbitMQ would deliver. Meant for
+    benchmarks and local runs without Docker; nothing is persisted and
+    publishes are confirmed immediately.
+    """
+    
+    def __init__(self, service_name: str = "In-memory", topology: Topology = ECOMMERCE_TOPOLOGY,
+                 consumers: Optional[dict[str, ConsumerConfig]] = None, codec: Optional[str] = None):
+        self.service_name = service_name
+        self.topology = topology
+        self.consumers = consumers or {}
+        self.codecs = CodecRegistry(codec or os.getenv('EVENT_CODEC', 'json'))
+        self.queues: dict[str, asyncio.Queue] = {}
+        self.published: dict[str, int] = {}
+        self.failed = 0
+        self.workers = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('HANDLER_THREAD_POOL_SIZE', '8')),
+            thread_name_prefix='event-handler'
+        )
+    
+    async def connect(self):
+        """Create the in-process queues"""
+        self.loop = asyncio.get_running_loop()
+        self.queues = {name: asyncio.Queue() for name in self.topology.queues}
+    
+    async def publish(self, routing_key: str, event: Any, caused_by: Optional[dict] = None,
+                      trace_headers: Optional[dict] = None) -> asyncio.Future:
+        """Encode and route an event; the returned future is already resolved"""
+        body, content_type = self.codecs.encode(event)
+        for queue_name in self.topology.route(routing_key):
+            self.queues[queue_name].put_nowait((body, content_type))
+        self.published[routing_key] = self.published.get(routing_key, 0) + 1
+        
+        confirm = self.loop.create_future()
+        confirm.set_result(None)
+        return confirm
+    
+    def publish_threadsafe(self, routing_key: str, event: Any, caused_by: Optional[dict] = None) -> concurrent.futures.Future:
+        """Publish from a sync handler thread"""
+        return asyncio.run_coroutine_threadsafe(self.publish(routing_key, event), self.loop)
+    
+    def current_trace_headers(self) -> dict:
+        """Nothing is traced in process"""
+        return {}
+    
+    async def subscribe(self, queue_name: str, callback: Callable[[dict], Union[None, Awaitable[None]]],
+                        config: Optional[ConsumerConfig] = None):
+        """Start max_concurrency workers handling the queue (coroutine or sync callback)"""
+        config = config or self.consumers.get(queue_name) or ConsumerConfig.from_env(queue_name)
+        queue = self.queues[queue_name]
+        is_async = asyncio.iscoroutinefunction(callback)
+        
+        async def handle(data: dict):
+            if is_async:
+                await callback(data)
+            else:
+                await self.loop.run_in_executor(self.executor, callback, data)
+        
+        for _ in range(config.max_concurrency):
+            worker = asyncio.create_task(self._consume(queue, handle))
+            self.workers.add(worker)
+            worker.add_done_callback(self.workers.discard)
+    
+    async def subscribe_batch(self, queue_name: str,
+                              handler: Callable[[list[dict]], Union[Optional[list], Awaitable[Optional[list]]]],
+                              max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None,
+                              config: Optional[ConsumerConfig] = None):
+        """Start max_concurrency workers handing the queue's events to handler in lists"""
+        config = config or self.consumers.get(queue_name) or ConsumerConfig.from_env(queue_name)
+        max_batch = max_batch or config.max_batch
+        max_wait = (config.max_wait_ms if max_wait_ms is None else max_wait_ms) / 1000
+        queue = self.queues[queue_name]
+        is_async = asyncio.iscoroutinefunction(handler)
+        
+        async def handle(events: list[dict]) -> int:
+            """Run the handler; number of events it failed"""
+            try:
+                if is_async:
+                    failed = await handler(events)
+                else:
+                    failed = await self.loop.run_in_executor(self.executor, handler, events)
+            except Exception:
+                return len(events)
+            return len(failed or [])
+        
+        for _ in range(config.max_concurrency):
+            worker = asyncio.create_task(self._consume_batches(queue, handle, max_batch, max_wait))
+            self.workers.add(worker)
+            worker.add_done_callback(self.workers.discard)
+    
+    async def _consume_batches(self, queue: asyncio.Queue, handle: Callable[[list[dict]], Awaitable[int]],
+                               max_batch: int, max_wait: float):
+        """Batch worker loop: take what's queued, waiting up to max_wait to fill the batch"""
+        while True:
+            items = [await queue.get()]
+            deadline = self.loop.time() + max_wait
+            while len(items) < max_batch:
+                if not queue.empty():
+                    items.append(queue.get_nowait())
+                    continue
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            events = []
+            for body, content_type in items:
+                try:
+                    events.append(self.codecs.decode(body, content_type))
+                except Exception:
+                    self.failed += 1
+            if events:
+                self.failed += await handle(events)
+            for _ in items:
+                queue.task_done()
+    
+    async def _consume(self, queue: asyncio.Queue, handle: Callable[[dict], Awaitable[None]]):
+        """Worker loop; a failing handler drops the message like a reject without requeue"""
+        while True:
+            body, content_type = await queue.get()
+            try:
+                await handle(self.codecs.decode(body, content_type))
+            except Exception:
+                self.failed += 1
+            finally:
+                queue.task_done()
+    
+    def depth(self, queue_name: str) -> int:
+        """Messages waiting on a queue"""
+        return self.queues[queue_name].qsize()
+    
+    async def join(self, *queue_names: str):
+        """Wait until every message routed to the given queues has been handled"""
+        await asyncio.gather(*(self.queues[name].join() for name in queue_names))
+    
+    async def close(self):
+        """Stop the workers"""
+        for worker in list(self.workers):
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.executor.shutdown(wait=False)
\ No newline at end of file
@@ -0,0 +1,190 @@
+import os
+from prometheus_client import Counter, Histogram, Gauge
+
+# Workers under WorkerSupervisor write metrics to files the supervisor aggregates
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+# Buckets sized to what each stage actually takes: publisher confirms and
+# healthy queue waits are sub-millisecond, handlers range from a cached
+# projection update to multi-second payments, and backlogs wait minutes
+CONFIRM_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0)
+QUEUE_WAIT_BUCKETS = (.0001, .0005, .001, .0025, .005, .01, .05, .1, .5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+HANDLER_BUCKETS = (.0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.0, 3.0, 5.0, 10.0)
+# Trace origin to publish: an order takes seconds to get through payment and shipping
+PIPELINE_BUCKETS = (.005, .01, .05, .1, .25, .5, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 7.5, 10.0, 15.0, 30.0, 60.0)
+
+class LabelChildren(dict):
+    """Children of one labelled metric, resolved on first use rather than on every observation.
+    
+    metric.labels() validates and joins the label values on each call; a
+    dict lookup is several times cheaper on per-message paths. Keys are the
+    label value, or a tuple of values for metrics with several labels.
+    """
+    
+    def __init__(self, metric):
+        super().__init__()
+        self.metric = metric
+    
+    def __missing__(self, labels):
+        child = self[labels] = self.metric.labels(*labels) if isinstance(labels, tuple) else self.metric.labels(labels)
+        return child
+
+class PublisherMetrics:
+    """Prometheus metrics for the outbound publish buffer"""
+    
+    def __init__(self):
+        self.buffer_depth = Gauge(
+            'publish_buffer_depth', 'Messages waiting in the outbound publish buffer', multiprocess_mode='livesum'
+        )
+        self.depth_fn = None
+        self.flush_latency = Histogram(
+            'publish_flush_latency_seconds', 'Time to publish and confirm one batch',
+            buckets=CONFIRM_BUCKETS
+        )
+        self.overflow_total = Counter('publish_overflow_total', 'Messages that overflowed the publish buffer', ['outcome'])
+        self.overflow_by_outcome = LabelChildren(self.overflow_total)
+    
+    def track_buffer_depth(self, depth_fn) -> None:
+        """Report buffer depth from a callable at scrape time"""
+        self.depth_fn = depth_fn
+        if not MULTIPROCESS:
+            self.buffer_depth.set_function(depth_fn)
+    
+    def sample_buffer_depth(self) -> None:
+        """Store the current depth; multiprocess mode can't call back into workers at scrape time"""
+        if MULTIPROCESS and self.depth_fn:
+            self.buffer_depth.set(self.depth_fn())
+    
+    def record_publish_flush_latency(self, duration: float) -> None:
+        """Record batch publish latency"""
+        self.flush_latency.observe(duration)
+    
+    def increment_publish_overflow(self, outcome: str) -> None:
+        """Count a dropped or spilled message"""
+        self.overflow_by_outcome[outcome].inc()
+
+class ChannelMetrics:
+    """Prometheus metrics for the RabbitMQ channel pool"""
+    
+    def __init__(self):
+        self.recoveries_total = Counter(
+            'rabbitmq_channel_recoveries_total', 'Channels reopened or replaced after an error', ['role']
+        )
+        self.recoveries_by_role = LabelChildren(self.recoveries_total)
+    
+    def increment_channel_recovery(self, role: str) -> None:
+        """Count a publish or consume channel that came back after an error"""
+        self.recoveries_by_role[role].inc()
+
+class DedupMetrics:
+    """Prometheus metrics for consumer-side event deduplication"""
+    
+    def __init__(self):
+        self.dedup_total = Counter(
+            'event_dedup_total', 'Dedup checks by result (hit_local, hit_redis, in_progress or miss)', ['queue', 'result']
+        )
+        self.dedup_by_result = LabelChildren(self.dedup_total)
+    
+    def record_dedup(self, queue: str, result: str) -> None:
+        """Count a dedup check; hits are redeliveries that were skipped"""
+        self.dedup_by_result[queue, result].inc()
+
+class FailureMetrics:
+    """Prometheus metrics for handler failures"""
+    
+    def __init__(self):
+        self.failures_total = Counter(
+            'event_handler_failures_total', 'Failed deliveries by outcome (retried or dead_lettered)', ['queue', 'outcome']
+        )
+        self.failures_by_outcome = LabelChildren(self.failures_total)
+    
+    def increment_failures(self, queue: str, outcome: str) -> None:
+        """Count a failed delivery and what happened to it"""
+        self.failures_by_outcome[queue, outcome].inc()
+
+class BatchMetrics:
+    """Prometheus metrics for batch consumers"""
+    
+    def __init__(self):
+        self.batch_size = Histogram(
+            'event_batch_size', 'Deliveries handed to a batch handler at once',
+            ['queue'], buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+        )
+        self.batch_processing = Histogram(
+            'event_batch_processing_seconds', 'Batch handler processing time per batch',
+            ['queue'], buckets=HANDLER_BUCKETS
+        )
+        self.batch_size_by_queue = LabelChildren(self.batch_size)
+        self.batch_processing_by_queue = LabelChildren(self.batch_processing)
+    
+    def record_batch(self, queue: str, size: int, duration: float) -> None:
+        """Record one handled batch"""
+        self.batch_size_by_queue[queue].observe(size)
+        self.batch_processing_by_queue[queue].observe(duration)
+
+class TracingMetrics:
+    """Prometheus histograms for per-stage and end-to-end pipeline latency"""
+    
+    def __init__(self):
+        self.queue_wait = Histogram(
+            'event_queue_wait_seconds', 'Time from publish until a handler picked the message up',
+            ['queue'], buckets=QUEUE_WAIT_BUCKETS
+        )
+        self.processing = Histogram(
+            'event_processing_seconds', 'Handler processing time per message',
+            ['queue'], buckets=HANDLER_BUCKETS
+        )
+        self.pipeline_latency = Histogram(
+            'event_pipeline_latency_seconds', 'Time from the origin of a trace until this event was published',
+            ['routing_key'], buckets=PIPELINE_BUCKETS
+        )
+        self.queue_wait_by_queue = LabelChildren(self.queue_wait)
+        self.processing_by_queue = LabelChildren(self.processing)
+        self.pipeline_latency_by_routing_key = LabelChildren(self.pipeline_latency)
+    
+    def record_queue_wait(self, queue: str, duration: float) -> None:
+        """Record how long a message waited before processing"""
+        self.queue_wait_by_queue[queue].observe(duration)
+    
+    def record_processing_time(self, queue: str, duration: float) -> None:
+        """Record handler processing time"""
+        self.processing_by_queue[queue].observe(duration)
+    
+    def record_pipeline_latency(self, routing_key: str, duration: float) -> None:
+        """Record end-to-end latency up to publishing routing_key"""
+        self.pipeline_latency_by_routing_key[routing_key].observe(duration)
+
+class ConsumerMetrics:
+    """Prometheus gauges for consumer load: handlers running, queue backlog and event loop lag"""
+    
+    def __init__(self):
+        self.in_flight = Gauge(
+            'event_handlers_in_flight', 'Handler calls running (a batch counts once)', ['queue'],
+            multiprocess_mode='livesum'
+        )
+        self.queue_depth = Gauge(
+            'event_queue_depth', 'Messages waiting in the queue: ready on RabbitMQ, unread plus pending on Redis Streams',
+            ['queue'], multiprocess_mode='livemax'
+        )
+        self.queue_consumers = Gauge('event_queue_consumers', 'Consumers attached to the queue', ['queue'],
+                                     multiprocess_mode='livemax')
+        self.event_loop_lag = Gauge(
+            'event_loop_lag_seconds', 'Worst lag of the asyncio event loop over the last poll interval',
+            multiprocess_mode='livemax'
+        )
+        self.in_flight_by_queue = LabelChildren(self.in_flight)
+        self.queue_depth_by_queue = LabelChildren(self.queue_depth)
+        self.queue_consumers_by_queue = LabelChildren(self.queue_consumers)
+    
+    def handlers_in_flight(self, queue: str) -> Gauge:
+        """In-flight gauge of one queue, for a consumer to inc/dec around each handler call"""
+        return self.in_flight_by_queue[queue]
+    
+    def record_queue_depth(self, queue: str, messages: int, consumers: int) -> None:
+        """Record a queue's backlog and consumer count"""
+        self.queue_depth_by_queue[queue].set(messages)
+        self.queue_consumers_by_queue[queue].set(consumers)
+    
+    def record_event_loop_lag(self, lag: float) -> None:
+        """Record the worst recent event loop lag"""
+        self.event_loop_lag.set(lag)
\ No newline at end of file
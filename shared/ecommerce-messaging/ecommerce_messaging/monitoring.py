@@ -0,0 +1,44 @@
+import asyncio
+import collections
+import math
+import os
+from typing import Awaitable, Callable
+from .metrics import ConsumerMetrics
+
+def poll_interval() -> float:
+    """Seconds between queue depth polls (METRICS_POLL_INTERVAL_SECONDS)"""
+    return float(os.getenv('METRICS_POLL_INTERVAL_SECONDS', '5'))
+
+def event_loop_lag_interval() -> float:
+    """Seconds between event loop lag samples (EVENT_LOOP_LAG_INTERVAL_MS)"""
+    return float(os.getenv('EVENT_LOOP_LAG_INTERVAL_MS', '500')) / 1000
+
+async def sample_event_loop_lag(metrics: ConsumerMetrics, interval: float, window: float):
+    """Sleep for interval and record how much later than that the loop woke us.
+    
+    The excess is the time ready callbacks waited behind other work on the
+    loop, e.g. a sync handler or a large decode that should be offloaded.
+    The gauge holds the worst sample of the last window seconds, so a stall
+    shows up even when it falls between two scrapes.
+    """
+    loop = asyncio.get_running_loop()
+    samples = collections.deque(maxlen=max(1, math.ceil(window / interval)))
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - started - interval))
+        metrics.record_event_loop_lag(max(samples))
+
+async def poll_queue_depths(metrics: ConsumerMetrics, queues: set[str],
+                            depth_of: Callable[[str], Awaitable[tuple[int, int]]],
+                            interval: float, service_name: str):
+    """Record (messages, consumers) of every consumed queue every interval seconds"""
+    while True:
+        for queue_name in list(queues):
+            try:
+                messages, consumers = await depth_of(queue_name)
+            except Exception as e:
+                print(f"{service_name}: Polling depth of '{queue_name}' failed: {e!r}")
+                continue
+            metrics.record_queue_depth(queue_name, messages, consumers)
+        await asyncio.sleep(interval)
\ No newline at end of file
@@ -0,0 +1,194 @@
+import asyncio
+import base64
+import json
+import os
+import time
+import uuid
+from typing import Optional
+import aio_pika
+from .channels import ChannelPool
+
+class PublishBufferFullException(Exception):
+    """Raised for messages dropped because the outbound buffer is full"""
+    pass
+
+class SpillFile:
+    """Append-only JSON-lines file holding messages that overflowed the buffer"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def append(self, routing_key: str, message: aio_pika.Message):
+        """Write a message to disk"""
+        record = {
+            'routing_key': routing_key,
+            'body': base64.b64encode(message.body).decode(),
+            'content_type': message.content_type,
+            'message_id': message.message_id,
+            'correlation_id': message.correlation_id,
+            'headers': message.headers,
+            'delivery_mode': int(message.delivery_mode)
+        }
+        with open(self.path, 'a') as spill:
+            spill.write(json.dumps(record) + '\n')
+    
+    def take(self) -> list:
+        """Atomically claim everything spilled so far"""
+        if not os.path.exists(self.path):
+            return []
+        
+        # Per-process claim path: publishers sharing the spill file never overwrite each other's claim
+        claimed = f"{self.path}.replaying.{os.getpid()}.{uuid.uuid4().hex}"
+        try:
+            os.replace(self.path, claimed)
+        except FileNotFoundError:
+            # Another process claimed it first
+            return []
+        with open(claimed) as spill:
+            records = [json.loads(line) for line in spill if line.strip()]
+        os.remove(claimed)
+        
+        return [
+            (record['routing_key'], aio_pika.Message(
+                base64.b64decode(record['body']),
+                content_type=record['content_type'],
+                # Absent from records spilled by earlier versions
+                message_id=record.get('message_id'),
+                correlation_id=record.get('correlation_id'),
+                headers=record['headers'],
+                delivery_mode=aio_pika.DeliveryMode(record['delivery_mode'])
+            ))
+            for record in records
+        ]
+
+class ConfirmingPublisher:
+    """Batched, pipelined publisher on top of RabbitMQ publisher confirms.
+    
+    Messages go through a bounded in-process buffer drained by a fixed number
+    of publisher coroutines. Each drainer takes a batch (by size, or whatever
+    arrived within the flush interval), writes it without waiting between
+    messages, and a semaphore caps the messages still waiting for a broker
+    confirm. When the buffer is full the overflow policy decides: ``block``
+    the producer, ``drop`` the message, or ``spill`` it to disk for replay.
+    """
+    
+    OVERFLOW_POLICIES = ('block', 'drop', 'spill')
+    
+    def __init__(self, channels: ChannelPool, metrics, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, max_outstanding: Optional[int] = None,
+                 buffer_size: Optional[int] = None, workers: Optional[int] = None,
+                 overflow_policy: Optional[str] = None):
+        self.channels = channels
+        self.metrics = metrics
+        self.batch_size = batch_size or int(os.getenv('PUBLISH_BATCH_SIZE', '100'))
+        self.flush_interval = flush_interval or float(os.getenv('PUBLISH_FLUSH_INTERVAL_MS', '5')) / 1000
+        self.window = asyncio.Semaphore(max_outstanding or int(os.getenv('PUBLISH_MAX_OUTSTANDING_CONFIRMS', '1000')))
+        self.workers = workers or int(os.getenv('PUBLISH_WORKERS', '4'))
+        self.overflow_policy = overflow_policy or os.getenv('PUBLISH_OVERFLOW_POLICY', 'block')
+        if self.overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {self.overflow_policy}")
+        
+        self.buffer = asyncio.Queue(maxsize=buffer_size or int(os.getenv('PUBLISH_BUFFER_SIZE', '10000')))
+        self.spill = SpillFile(os.getenv('PUBLISH_SPILL_PATH', '/tmp/publish-spill.jsonl'))
+        self.spilled = asyncio.Event()
+        self.tasks = []
+        self.metrics.track_buffer_depth(self.buffer.qsize)
+    
+    def start(self):
+        """Start drainer coroutines and replay anything spilled by a previous run"""
+        self.tasks = [asyncio.create_task(self._drain()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self._replay_spill()))
+        self.spilled.set()
+    
+    async def publish(self, routing_key: str, message: aio_pika.Message) -> asyncio.Future:
+        """Admit a message into the buffer; the returned future resolves when the broker confirms it"""
+        future = asyncio.get_running_loop().create_future()
+        item = (routing_key, message, future)
+        
+        if self.overflow_policy == 'block':
+            await self.buffer.put(item)
+            return future
+        
+        try:
+            self.buffer.put_nowait(item)
+        except asyncio.QueueFull:
+            if self.overflow_policy == 'drop':
+                self.metrics.increment_publish_overflow('dropped')
+                self._fail(future, PublishBufferFullException(f"Dropped message for '{routing_key}'"))
+            else:
+                self.spill.append(routing_key, message)
+                self.metrics.increment_publish_overflow('spilled')
+                self.spilled.set()
+                # Durably handed off to the spill file; replay publishes it later
+                future.set_result(None)
+        
+        return future
+    
+    async def _drain(self):
+        """Publisher coroutine: take batches from the buffer and send them"""
+        while True:
+            batch = [await self.buffer.get()]
+            if self.buffer.qsize() < self.batch_size - 1:
+                # Give a batch the chance to fill up
+                await asyncio.sleep(self.flush_interval)
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.buffer.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            self.metrics.sample_buffer_depth()
+            started = time.perf_counter()
+            try:
+                # Whole batch on one pooled channel; concurrent drainers use different ones
+                exchange = await self.channels.exchange()
+            except Exception as e:
+                print(f"No publisher channel available: {e!r}")
+                for _, _, future in batch:
+                    self._fail(future, e)
+            else:
+                await asyncio.gather(*(self._send(exchange, *item) for item in batch))
+                self.metrics.record_publish_flush_latency(time.perf_counter() - started)
+            
+            for _ in batch:
+                self.buffer.task_done()
+    
+    async def _send(self, exchange: aio_pika.abc.AbstractExchange, routing_key: str,
+                    message: aio_pika.Message, future: asyncio.Future):
+        """Publish a single message inside the confirm window"""
+        async with self.window:
+            try:
+                await exchange.publish(message, routing_key=routing_key)
+            except Exception as e:
+                print(f"Publish to '{routing_key}' failed: {e!r}")
+                self._fail(future, e)
+            else:
+                if not future.done():
+                    future.set_result(None)
+    
+    async def _replay_spill(self):
+        """Feed spilled messages back into the buffer, blocking while it is full"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.spilled.wait()
+            self.spilled.clear()
+            for routing_key, message in self.spill.take():
+                future = loop.create_future()
+                await self.buffer.put((routing_key, message, future))
+    
+    def _fail(self, future: asyncio.Future, error: Exception):
+        """Fail a publish future without warning if nobody awaits it"""
+        if not future.done():
+            future.set_exception(error)
+            future.add_done_callback(lambda f: f.exception())
+    
+    async def flush(self):
+        """Wait until everything admitted to the buffer has been confirmed"""
+        await self.buffer.join()
+    
+    async def stop(self):
+        """Flush the buffer and stop drainer coroutines; spilled messages stay on disk"""
+        await self.flush()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
\ No newline at end of file
@@ -0,0 +1,357 @@
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Optional, Union
+from .base import BaseEventBus
+from .consumer import ConsumerConfig, ConsumerScheduler
+from .dedup import IN_PROGRESS
+from .topology import QueueSpec, Topology, ECOMMERCE_TOPOLOGY, LAST_ERROR_HEADER
+from .tracing import TraceContext
+
+try:
+    import redis.asyncio as redis
+    from redis.exceptions import ResponseError
+except ImportError:  # optional dependency
+    redis = None
+
+def event_bus_backend() -> str:
+    """Configured transport: 'rabbitmq' (default) or 'redis'"""
+    backend = os.getenv('EVENT_BUS_BACKEND', 'rabbitmq').lower()
+    if backend not in ('rabbitmq', 'redis'):
+        raise ValueError(f"EVENT_BUS_BACKEND must be rabbitmq or redis, got {backend!r}")
+    return backend
+
+class StreamEntry:
+    """One event read from a queue's stream"""
+    
+    def __init__(self, entry_id: str, fields: dict):
+        self.entry_id = entry_id
+        self.body = fields[b'body']
+        self.content_type = fields[b'content_type'].decode()
+        self.message_id = fields[b'message_id'].decode() or None
+        self.headers = json.loads(fields[b'headers'])
+
+class RedisStreamsEventBus(BaseEventBus):
+    """Event bus on Redis Streams with the same interface as RabbitMQEventBus.
+    
+    Every queue of the topology is a stream (stream:<queue>) read by a
+    consumer group named after the queue. Routing happens on the publisher:
+    each service registers its queues' bindings in a shared hash, and
+    publishing matches the routing key against every registered binding and
+    XADDs to each matching stream.
+    Publishes go through a bounded buffer and are written in pipelined
+    batches with approximate MAXLEN trimming; the returned future resolves
+    once the batch's pipeline executed.
+    
+    Consumers XREADGROUP with COUNT/BLOCK and XACK what they handled. An
+    entry whose handler failed stays pending and is reclaimed with
+    XAUTOCLAIM once it has been idle for STREAM_CLAIM_IDLE_MS; after the
+    retry policy's max_attempts deliveries it moves to the
+    stream:<queue>.dlq stream. Entries left behind by a crashed consumer
+    are reclaimed the same way, so the idle time must exceed the slowest
+    handler or entries still being handled get taken over.
+    """
+    
+    def __init__(self, service_name: str, topology: Topology = ECOMMERCE_TOPOLOGY,
+                 consumers: Optional[dict[str, ConsumerConfig]] = None):
+        super().__init__(service_name, topology, consumers)
+        self.redis_url = os.getenv('STREAMS_REDIS_URL', 'redis://redis:6379/2')
+        self.redis_client = None
+        self.key_prefix = "stream:"
+        self.bindings_key = "stream:bindings"
+        # Bindings of every service, refreshed from Redis; starts with our own
+        self.routing = topology
+        self.bindings_refresh = float(os.getenv('STREAM_BINDINGS_REFRESH_SECONDS', '10'))
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+        self.max_length = int(os.getenv('STREAM_MAXLEN', '1000000'))
+        self.batch_size = int(os.getenv('PUBLISH_BATCH_SIZE', '100'))
+        self.block_ms = int(os.getenv('STREAM_BLOCK_MS', '1000'))
+        self.claim_idle_ms = int(os.getenv('STREAM_CLAIM_IDLE_MS', '30000'))
+        self.buffer: Optional[asyncio.Queue] = None
+        self.tasks = []
+    
+    async def connect(self, max_retries: int = 10, retry_delay: int = 2):
+        """Connect to Redis and create a consumer group per queue"""
+        if redis is None:
+            raise RuntimeError("EVENT_BUS_BACKEND=redis needs the redis package (ecommerce-messaging[redis])")
+        self.loop = asyncio.get_running_loop()
+        
+        for attempt in range(max_retries):
+            try:
+                self.redis_client = redis.from_url(self.redis_url)
+                for queue_name in self.topology.queues:
+                    await self._create_group(queue_name)
+                await self.redis_client.hset(self.bindings_key, mapping={
+                    spec.name: json.dumps(spec.routing_keys) for spec in self.topology.queues.values()
+                })
+                await self._load_bindings()
+                await self.dedup.connect()
+                break
+            except Exception:
+                if attempt == max_retries - 1:
+                    raise
+                await asyncio.sleep(retry_delay)
+        
+        self.buffer = asyncio.Queue(maxsize=int(os.getenv('PUBLISH_BUFFER_SIZE', '10000')))
+        self.publisher_metrics.track_buffer_depth(self.buffer.qsize)
+        self.tasks.append(asyncio.create_task(self._write()))
+        self.tasks.append(asyncio.create_task(self._refresh_bindings()))
+        self.tasks.extend(self._start_monitoring())
+        print(f"{self.service_name}: Connected to Redis Streams")
+    
+    async def _queue_depth(self, queue_name: str) -> tuple[int, int]:
+        """Entries the queue's group hasn't read yet plus those read but not acked, and its consumers"""
+        for group in await self.redis_client.xinfo_groups(self._stream(queue_name)):
+            if group['name'] in (queue_name, queue_name.encode()):
+                # lag is unknown (None) right after entries were deleted from the middle of the stream
+                return (group.get('lag') or 0) + group['pending'], group['consumers']
+        return 0, 0
+    
+    async def _create_group(self, queue_name: str):
+        """Consumer group for a queue, reading the stream from its start"""
+        try:
+            await self.redis_client.xgroup_create(self._stream(queue_name), queue_name, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+    
+    async def _load_bindings(self):
+        """Route by the bindings every service registered"""
+        bindings = await self.redis_client.hgetall(self.bindings_key)
+        self.routing = Topology(self.topology.exchange, [
+            QueueSpec(name.decode(), json.loads(routing_keys)) for name, routing_keys in bindings.items()
+        ])
+    
+    async def _refresh_bindings(self):
+        """Pick up queues of services that started after us"""
+        while True:
+            await asyncio.sleep(self.bindings_refresh)
+            try:
+                await self._load_bindings()
+            except Exception as e:
+                print(f"{self.service_name}: Could not refresh stream bindings: {e!r}")
+    
+    def _stream(self, queue_name: str) -> str:
+        return f"{self.key_prefix}{queue_name}"
+    
+    async def publish(self, routing_key: str, event: Any, caused_by: Optional[dict] = None,
+                      trace_headers: Optional[dict] = None) -> asyncio.Future:
+        """Publish event to the streams of every queue bound to routing_key.
+        
+        Waits for room in the outbound buffer (backpressure); the returned
+        future resolves once Redis stored the entry.
+        """
+        trace = self._publish_trace(caused_by, trace_headers)
+        future = self.loop.create_future()
+        await self.buffer.put((routing_key, self._build_fields(routing_key, event, trace), future))
+        return future
+    
+    def _build_fields(self, routing_key: str, event: Any, trace: Optional[TraceContext] = None) -> dict:
+        """Serialize event into stream entry fields carrying the trace context"""
+        body, content_type, message_id, headers = self._encode(routing_key, event, trace)
+        return {
+            'routing_key': routing_key,
+            'body': body,
+            'content_type': content_type,
+            'message_id': message_id or '',
+            'headers': json.dumps(headers)
+        }
+    
+    async def _write(self):
+        """Writer coroutine: XADD buffered entries in pipelined batches"""
+        while True:
+            batch = [await self.buffer.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.buffer.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            self.publisher_metrics.sample_buffer_depth()
+            started = time.perf_counter()
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    for routing_key, fields, _ in batch:
+                        for queue_name in self.routing.route(routing_key):
+                            pipe.xadd(self._stream(queue_name), fields, maxlen=self.max_length, approximate=True)
+                    await pipe.execute()
+            except Exception as e:
+                print(f"{self.service_name}: XADD of {len(batch)} events failed: {e!r}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                        future.add_done_callback(lambda f: f.exception())
+            else:
+                self.publisher_metrics.record_publish_flush_latency(time.perf_counter() - started)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            
+            for _ in batch:
+                self.buffer.task_done()
+    
+    async def subscribe(self, queue_name: str, callback: Callable[[dict], Union[None, Awaitable[None]]],
+                        config: Optional[ConsumerConfig] = None):
+        """Subscribe to a queue's stream (coroutine or sync callback)"""
+        config = config or self.consumers.get(queue_name) or ConsumerConfig.from_env(queue_name)
+        scheduler = ConsumerScheduler(config.max_concurrency)
+        # Entries read but not yet handled; the prefetch count caps them like on RabbitMQ
+        window = asyncio.Semaphore(config.prefetch_count)
+        in_flight = set()
+        self.consumed_queues.add(queue_name)
+        
+        async def handle(entry: StreamEntry):
+            try:
+                outcome = await self._handle_delivery(queue_name, entry, callback)
+            except Exception as e:
+                await self._handle_failure(queue_name, [entry], e)
+            else:
+                if outcome != IN_PROGRESS:
+                    # Handled, or a redelivery of an event already handled
+                    await self.redis_client.xack(self._stream(queue_name), queue_name, entry.entry_id)
+                # Otherwise another consumer holds its lease; stays pending and is reclaimed once idle
+            finally:
+                in_flight.discard(entry.entry_id)
+                window.release()
+        
+        async def dispatch(entries: list[StreamEntry]):
+            for entry in entries:
+                if entry.entry_id in in_flight:
+                    # Reclaimed while we're still handling it
+                    continue
+                await window.acquire()
+                in_flight.add(entry.entry_id)
+                asyncio.create_task(scheduler.run(handle, entry))
+        
+        self._start_readers(queue_name, config.prefetch_count, self.block_ms, dispatch)
+        print(f"{self.service_name}: Consuming '{queue_name}' from Redis Streams (prefetch={config.prefetch_count}, "
+              f"concurrency={config.max_concurrency})")
+    
+    async def subscribe_batch(self, queue_name: str,
+                              handler: Callable[[list[dict]], Union[Optional[list], Awaitable[Optional[list]]]],
+                              max_batch: Optional[int] = None, max_wait_ms: Optional[float] = None,
+                              config: Optional[ConsumerConfig] = None):
+        """Subscribe with a handler that takes a list of events (coroutine or sync).
+        
+        Each XREADGROUP of up to max_batch entries is one batch; handled
+        entries are XACKed with one call. Returned (event, error) pairs and
+        a raising handler leave the entries pending for a retry; pairs
+        naming objects the handler wasn't given fail the whole batch.
+        """
+        config = config or self.consumers.get(queue_name) or ConsumerConfig.from_env(queue_name)
+        max_batch = max_batch or config.max_batch
+        max_wait_ms = config.max_wait_ms if max_wait_ms is None else max_wait_ms
+        scheduler = ConsumerScheduler(config.max_concurrency)
+        window = asyncio.Semaphore(config.max_concurrency)
+        stream = self._stream(queue_name)
+        in_flight = set()
+        self.consumed_queues.add(queue_name)
+        
+        async def handle(entries: list[StreamEntry]):
+            try:
+                failures, in_progress = await self._handle_batch(queue_name, entries, handler)
+                for index, error in failures.items():
+                    await self._handle_failure(queue_name, [entries[index]], error)
+                # Failed entries, and those whose lease another consumer holds, stay pending
+                done = [entry.entry_id for index, entry in enumerate(entries)
+                        if index not in failures and index not in in_progress]
+                if done:
+                    await self.redis_client.xack(stream, queue_name, *done)
+            finally:
+                in_flight.difference_update(entry.entry_id for entry in entries)
+                window.release()
+        
+        async def dispatch(entries: list[StreamEntry]):
+            # Skip entries reclaimed while we're still handling them
+            entries = [entry for entry in entries if entry.entry_id not in in_flight]
+            if not entries:
+                return
+            await window.acquire()
+            in_flight.update(entry.entry_id for entry in entries)
+            asyncio.create_task(scheduler.run(handle, entries))
+        
+        self._start_readers(queue_name, max_batch, int(max_wait_ms) or 1, dispatch)
+        print(f"{self.service_name}: Consuming '{queue_name}' from Redis Streams in batches "
+              f"(max_batch={max_batch}, concurrency={config.max_concurrency})")
+    
+    def _start_readers(self, queue_name: str, count: int, block_ms: int,
+                       dispatch: Callable[[list[StreamEntry]], Awaitable[None]]):
+        """Start the XREADGROUP loop and the XAUTOCLAIM loop of a subscription"""
+        self.tasks.append(asyncio.create_task(self._read(queue_name, count, block_ms, dispatch)))
+        self.tasks.append(asyncio.create_task(self._reclaim(queue_name, count, dispatch)))
+    
+    async def _read(self, queue_name: str, count: int, block_ms: int,
+                    dispatch: Callable[[list[StreamEntry]], Awaitable[None]]):
+        """Read new entries for this consumer and hand them to dispatch"""
+        stream = self._stream(queue_name)
+        while True:
+            try:
+                result = await self.redis_client.xreadgroup(
+                    queue_name, self.consumer_name, {stream: '>'}, count=count, block=block_ms
+                )
+            except Exception as e:
+                print(f"{self.service_name}: XREADGROUP on '{stream}' failed: {e!r}")
+                await asyncio.sleep(1)
+                continue
+            if result:
+                await dispatch(self._parse(result[0][1]))
+    
+    async def _reclaim(self, queue_name: str, count: int, dispatch: Callable[[list[StreamEntry]], Awaitable[None]]):
+        """Take over entries pending for longer than the claim idle time: failed or orphaned ones"""
+        idle_ms = self.claim_idle_ms
+        stream = self._stream(queue_name)
+        while True:
+            await asyncio.sleep(idle_ms / 2000)
+            start = '0-0'
+            try:
+                while True:
+                    start, claimed, _ = await self.redis_client.xautoclaim(
+                        stream, queue_name, self.consumer_name, idle_ms, start_id=start, count=count
+                    )
+                    entries = self._parse(claimed)
+                    if entries:
+                        await dispatch(entries)
+                    if start in (b'0-0', '0-0'):
+                        break
+            except Exception as e:
+                print(f"{self.service_name}: XAUTOCLAIM on '{stream}' failed: {e!r}")
+    
+    def _parse(self, entries: list) -> list[StreamEntry]:
+        """StreamEntry objects of raw entries; entries trimmed away come back without fields"""
+        return [StreamEntry(entry_id.decode(), fields) for entry_id, fields in entries if fields]
+    
+    async def _handle_failure(self, queue_name: str, entries: list[StreamEntry], error: Exception):
+        """Leave a failed entry pending for a retry, or dead-letter it once its attempts are used up"""
+        spec = self.topology.queue(queue_name)
+        stream = self._stream(queue_name)
+        for entry in entries:
+            pending = await self.redis_client.xpending_range(stream, queue_name, entry.entry_id, entry.entry_id, 1)
+            attempts = pending[0]['times_delivered'] if pending else 1
+            if spec is not None and spec.retry and attempts < spec.retry.max_attempts:
+                # Stays pending; _reclaim redelivers it once idle for the claim idle time
+                self.failure_metrics.increment_failures(queue_name, 'retried')
+                continue
+            
+            print(f"{self.service_name}: Dead-lettering entry from '{queue_name}' after {attempts} attempts: {error!r}")
+            self.failure_metrics.increment_failures(queue_name, 'dead_lettered')
+            headers = {**entry.headers, LAST_ERROR_HEADER: repr(error)[:256]}
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.xadd(f"{stream}.dlq", {
+                    'body': entry.body, 'content_type': entry.content_type,
+                    'message_id': entry.message_id or '', 'headers': json.dumps(headers)
+                })
+                pipe.xack(stream, queue_name, entry.entry_id)
+                await pipe.execute()
+    
+    async def close(self):
+        """Flush pending publishes, stop the readers and close the connection"""
+        if self.buffer is not None:
+            await self.buffer.join()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.redis_client is not None:
+            await self.redis_client.close()
+        await self._close_handlers()
\ No newline at end of file
@@ -0,0 +1,140 @@
+import asyncio
+import glob
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+from typing import Awaitable, Callable
+from prometheus_client import CollectorRegistry, start_http_server
+from prometheus_client import multiprocess
+
+WORKER_INDEX_ENV = 'WORKER_INDEX'
+WORKER_COUNT_ENV = 'WORKER_COUNT'
+
+def worker_processes() -> int:
+    """Configured number of worker processes; 1 runs the service in-process"""
+    return max(1, int(os.getenv('WORKER_PROCESSES', '1')))
+
+def is_worker() -> bool:
+    """True inside a process started by WorkerSupervisor"""
+    return WORKER_INDEX_ENV in os.environ
+
+def _run_worker(worker_main: Callable[[], Awaitable[None]], index: int, count: int):
+    """Worker process entry point: run the service until SIGTERM, then let it clean up"""
+    os.environ[WORKER_INDEX_ENV] = str(index)
+    os.environ[WORKER_COUNT_ENV] = str(count)
+    
+    async def serve():
+        task = asyncio.create_task(worker_main())
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, task.cancel)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    
+    asyncio.run(serve())
+
+class WorkerSupervisor:
+    """Runs a service as several worker processes so it can use every core.
+    
+    Each worker is a fresh (spawned) process with its own event loop, RabbitMQ
+    connection and channel. The supervisor serves the Prometheus metrics of
+    all workers on one port through the multiprocess collector and restarts
+    workers that exit. SIGHUP restarts the workers one at a time; SIGTERM or
+    SIGINT stops them, giving each time to flush and close.
+    """
+    
+    def __init__(self, service_name: str, worker_main: Callable[[], Awaitable[None]], workers: int,
+                 metrics_port: int, shutdown_timeout: float = 30.0, restart_delay: float = 1.0):
+        self.service_name = service_name
+        self.worker_main = worker_main
+        self.workers = workers
+        self.metrics_port = metrics_port
+        self.shutdown_timeout = shutdown_timeout
+        self.restart_delay = restart_delay
+        # Spawn rather than fork: workers import prometheus_client with
+        # multiprocess mode on and inherit no threads or event loop state
+        self.context = multiprocessing.get_context('spawn')
+        self.processes: dict[int, multiprocessing.Process] = {}
+        self.stopping = False
+        self.restart_requested = False
+    
+    def run(self):
+        """Start the workers and supervise them until told to stop"""
+        self._serve_metrics()
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_restart)
+        
+        for index in range(self.workers):
+            self._start(index)
+        print(f"{self.service_name}: Supervising {self.workers} workers, metrics on port {self.metrics_port}")
+        
+        while not self.stopping:
+            if self.restart_requested:
+                self.restart_requested = False
+                self._rolling_restart()
+            for index, process in list(self.processes.items()):
+                if not process.is_alive() and not self.stopping:
+                    print(f"{self.service_name}: Worker {index} exited with {process.exitcode}, restarting")
+                    self._reap(process)
+                    time.sleep(self.restart_delay)
+                    self._start(index)
+            time.sleep(0.5)
+        
+        for process in self.processes.values():
+            self._stop(process)
+        print(f"{self.service_name}: All workers stopped")
+    
+    def _serve_metrics(self):
+        """Expose metrics aggregated from every worker's files"""
+        metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', tempfile.mkdtemp(prefix='prometheus-'))
+        os.makedirs(metrics_dir, exist_ok=True)
+        # Files left over from a previous run would be counted again
+        for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+            os.remove(path)
+        
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(self.metrics_port, registry=registry)
+    
+    def _start(self, index: int):
+        """Spawn worker number index"""
+        process = self.context.Process(
+            target=_run_worker, args=(self.worker_main, index, self.workers), name=f"{self.service_name} worker {index}"
+        )
+        process.start()
+        self.processes[index] = process
+    
+    def _stop(self, process: multiprocessing.Process):
+        """SIGTERM a worker and wait for it to drain; kill it if it doesn't"""
+        if process.is_alive():
+            process.terminate()
+            process.join(self.shutdown_timeout)
+            if process.is_alive():
+                print(f"{self.service_name}: {process.name} did not stop in time, killing it")
+                process.kill()
+                process.join()
+        self._reap(process)
+    
+    def _reap(self, process: multiprocessing.Process):
+        """Drop a dead worker's live gauges from the aggregated metrics"""
+        multiprocess.mark_process_dead(process.pid)
+    
+    def _rolling_restart(self):
+        """Replace workers one at a time so the others keep consuming"""
+        for index in list(self.processes):
+            if self.stopping:
+                return
+            self._stop(self.processes[index])
+            self._start(index)
+        print(f"{self.service_name}: Restarted {self.workers} workers")
+    
+    def _request_stop(self, signum, frame):
+        self.stopping = True
+    
+    def _request_restart(self, signum, frame):
+        self.restart_requested = True
\ No newline at end of file
@@ -0,0 +1,254 @@
+import os
+from typing import Optional
+import aio_pika
+
+def topic_matches(binding_key: str, routing_key: str) -> bool:
+    """AMQP topic match: '*' is exactly one word, '#' zero or more"""
+    return _match_words(binding_key.split('.'), routing_key.split('.'))
+
+def _match_words(pattern: list[str], words: list[str]) -> bool:
+    if not pattern:
+        return not words
+    head, rest = pattern[0], pattern[1:]
+    if head == '#':
+        return any(_match_words(rest, words[i:]) for i in range(len(words) + 1))
+    return bool(words) and head in ('*', words[0]) and _match_words(rest, words[1:])
+
+# Delivery attempt number (1 = first delivery) and the error that caused the last retry
+ATTEMPTS_HEADER = 'x-attempts'
+LAST_ERROR_HEADER = 'x-last-error'
+
+class RetryPolicy:
+    """Delayed retries with exponential backoff, then dead-lettering.
+    
+    A failed delivery is republished to a retry queue whose TTL is the
+    backoff for that attempt; when the TTL expires RabbitMQ dead-letters it
+    back onto the work queue. After max_attempts deliveries the message is
+    rejected into the dead-letter queue instead.
+    """
+    
+    def __init__(self, max_attempts: int = 5, base_delay_ms: int = 1000, multiplier: float = 2.0,
+                 max_delay_ms: int = 60000):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be positive")
+        self.max_attempts = max_attempts
+        self.base_delay_ms = base_delay_ms
+        self.multiplier = multiplier
+        self.max_delay_ms = max_delay_ms
+    
+    @classmethod
+    def from_env(cls) -> 'RetryPolicy':
+        """Load settings from the RETRY_* environment variables"""
+        return cls(
+            max_attempts=int(os.getenv('RETRY_MAX_ATTEMPTS', '5')),
+            base_delay_ms=int(os.getenv('RETRY_BASE_DELAY_MS', '1000')),
+            multiplier=float(os.getenv('RETRY_BACKOFF_MULTIPLIER', '2')),
+            max_delay_ms=int(os.getenv('RETRY_MAX_DELAY_MS', '60000'))
+        )
+    
+    def delays_ms(self) -> list[int]:
+        """Backoff before each retry: delays_ms()[n - 1] follows failed delivery n"""
+        return [
+            min(self.max_delay_ms, int(self.base_delay_ms * self.multiplier ** n))
+            for n in range(self.max_attempts - 1)
+        ]
+
+QUEUE_TYPES = ('classic', 'quorum', 'lazy', 'stream')
+OVERFLOW_POLICIES = ('drop-head', 'reject-publish', 'reject-publish-dlx')
+
+class QueueSpec:
+    """Declarative queue: name, the routing keys bound to it, its type, length limits and retry policy.
+    
+    queue_type is one of:
+    - classic: the default, messages held in memory where possible
+    - quorum: replicated across the cluster, always durable
+    - lazy: classic queue on the version 2 storage (x-queue-version: 2), which keeps
+      only a small window of messages in memory and suits large backlogs. RabbitMQ
+      3.12+ ignores the old x-queue-mode=lazy argument and stores every classic
+      queue this way, so there it is the same as classic
+    - stream: append-only log that keeps messages after they are consumed, so a
+      consumer can start again from the first (or any) offset
+    
+    max_length / max_length_bytes bound the queue; overflow says whether the
+    oldest messages are dropped (drop-head) or new publishes are nacked
+    (reject-publish). Streams are trimmed by max_length_bytes and max_age (e.g. '7D').
+    """
+    
+    def __init__(self, name: str, routing_keys: list[str], durable: bool = True,
+                 retry: Optional[RetryPolicy] = None, queue_type: str = 'classic',
+                 max_length: Optional[int] = None, max_length_bytes: Optional[int] = None,
+                 overflow: Optional[str] = None, max_age: Optional[str] = None):
+        if queue_type not in QUEUE_TYPES:
+            raise ValueError(f"queue_type must be one of {QUEUE_TYPES}, got {queue_type!r}")
+        if overflow is not None and overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        if queue_type in ('quorum', 'stream') and not durable:
+            raise ValueError(f"{queue_type} queues are always durable")
+        if queue_type == 'stream' and (retry or overflow or max_length):
+            raise ValueError("stream queues keep consumed messages; use max_length_bytes or max_age "
+                             "instead of max_length/overflow, and they don't support retries")
+        if queue_type == 'quorum' and overflow == 'reject-publish-dlx':
+            raise ValueError("quorum queues don't support reject-publish-dlx")
+        if max_age is not None and queue_type != 'stream':
+            raise ValueError("max_age only applies to stream queues")
+        self.name = name
+        self.routing_keys = routing_keys
+        self.durable = durable
+        self.retry = retry
+        self.queue_type = queue_type
+        self.max_length = max_length
+        self.max_length_bytes = max_length_bytes
+        self.overflow = overflow
+        self.max_age = max_age
+    
+    @classmethod
+    def from_env(cls, name: str, routing_keys: list[str], retry: Optional[RetryPolicy] = None,
+                 queue_type: str = 'classic', max_age: Optional[str] = None) -> 'QueueSpec':
+        """Load settings for a queue, e.g. PAYMENTS_QUEUE_TYPE or PAYMENTS_MAX_LENGTH.
+        
+        Length limits fall back to QUEUE_MAX_LENGTH, QUEUE_MAX_LENGTH_BYTES and
+        QUEUE_OVERFLOW; streams only take their own MAX_LENGTH_BYTES and MAX_AGE.
+        """
+        prefix = name.upper().replace('-', '_')
+        queue_type = os.getenv(f'{prefix}_QUEUE_TYPE', queue_type)
+        if queue_type == 'stream' and retry is not None:
+            raise ValueError(f"{prefix}_QUEUE_TYPE=stream is not supported: '{name}' is a work queue with "
+                             f"retries and dead-lettering, which streams can't do; use classic, quorum or lazy")
+        
+        def setting(name: str) -> Optional[str]:
+            if queue_type == 'stream':
+                return os.getenv(f'{prefix}_{name}') or None
+            return os.getenv(f'{prefix}_{name}', os.getenv(f'QUEUE_{name}')) or None
+        
+        max_length = setting('MAX_LENGTH')
+        max_length_bytes = setting('MAX_LENGTH_BYTES')
+        return cls(
+            name, routing_keys, retry=retry, queue_type=queue_type,
+            max_length=int(max_length) if max_length else None,
+            max_length_bytes=int(max_length_bytes) if max_length_bytes else None,
+            overflow=setting('OVERFLOW'),
+            max_age=os.getenv(f'{prefix}_MAX_AGE', max_age)
+        )
+    
+    @property
+    def dead_letter_queue(self) -> str:
+        return f"{self.name}.dlq"
+    
+    def retry_queue(self, delay_ms: int) -> str:
+        """Retry queue for one backoff step; the delay is in the name so changing it never clashes"""
+        return f"{self.name}.retry.{delay_ms}ms"
+    
+    def arguments(self, dead_letter_exchange: str) -> dict:
+        """x-arguments the queue is declared with"""
+        arguments = {}
+        if self.queue_type in ('quorum', 'stream'):
+            arguments['x-queue-type'] = self.queue_type
+        elif self.queue_type == 'lazy':
+            arguments['x-queue-version'] = 2
+        if self.max_length is not None:
+            arguments['x-max-length'] = self.max_length
+        if self.max_length_bytes is not None:
+            arguments['x-max-length-bytes'] = self.max_length_bytes
+        if self.overflow is not None:
+            arguments['x-overflow'] = self.overflow
+        if self.max_age is not None:
+            arguments['x-max-age'] = self.max_age
+        if self.retry:
+            # Rejected messages go to <queue>.dlq
+            arguments['x-dead-letter-exchange'] = dead_letter_exchange
+            arguments['x-dead-letter-routing-key'] = self.name
+        return arguments
+
+def delivery_modes_from_env() -> dict[str, aio_pika.DeliveryMode]:
+    """Routing key patterns listed in TRANSIENT_ROUTING_KEYS (comma-separated) are published non-persistent"""
+    patterns = [pattern.strip() for pattern in os.getenv('TRANSIENT_ROUTING_KEYS', '').split(',')]
+    return {pattern: aio_pika.DeliveryMode.NOT_PERSISTENT for pattern in patterns if pattern}
+
+class Topology:
+    """Exchange and the queues bound to it, declared on connect.
+    
+    delivery_modes maps routing key patterns to the delivery mode events are
+    published with; the first matching pattern wins and anything unmatched is
+    persistent. Quorum queues and streams store every message on disk regardless.
+    """
+    
+    def __init__(self, exchange: str, queues: list[QueueSpec],
+                 exchange_type: aio_pika.ExchangeType = aio_pika.ExchangeType.TOPIC,
+                 delivery_modes: Optional[dict[str, aio_pika.DeliveryMode]] = None):
+        self.exchange = exchange
+        self.exchange_type = exchange_type
+        self.dead_letter_exchange = f"{exchange}.dlx"
+        self.queues = {spec.name: spec for spec in queues}
+        self.delivery_modes = delivery_modes or {}
+        self.routes = {}
+        self.modes = {}
+    
+    def with_queues(self, *queues: QueueSpec) -> 'Topology':
+        """Copy of this topology with extra service-specific queues"""
+        return Topology(self.exchange, [*self.queues.values(), *queues], self.exchange_type, self.delivery_modes)
+    
+    def queue(self, name: str) -> Optional[QueueSpec]:
+        """Look up a queue spec by name"""
+        return self.queues.get(name)
+    
+    def route(self, routing_key: str) -> list[str]:
+        """Names of the queues a routing key is delivered to"""
+        queues = self.routes.get(routing_key)
+        if queues is None:
+            queues = self.routes[routing_key] = [
+                spec.name for spec in self.queues.values()
+                if any(topic_matches(binding_key, routing_key) for binding_key in spec.routing_keys)
+            ]
+        return queues
+    
+    def delivery_mode(self, routing_key: str) -> aio_pika.DeliveryMode:
+        """Delivery mode to publish a routing key with"""
+        mode = self.modes.get(routing_key)
+        if mode is None:
+            mode = self.modes[routing_key] = next(
+                (mode for pattern, mode in self.delivery_modes.items() if topic_matches(pattern, routing_key)),
+                aio_pika.DeliveryMode.PERSISTENT
+            )
+        return mode
+    
+    async def declare(self, channel: aio_pika.abc.AbstractChannel) -> aio_pika.abc.AbstractExchange:
+        """Declare exchanges, queues, bindings and the retry/dead-letter queues; returns the exchange"""
+        exchange = await channel.declare_exchange(self.exchange, self.exchange_type)
+        dead_letter_exchange = await channel.declare_exchange(
+            self.dead_letter_exchange, aio_pika.ExchangeType.DIRECT, durable=True
+        )
+        
+        for spec in self.queues.values():
+            queue = await channel.declare_queue(
+                spec.name, durable=spec.durable, arguments=spec.arguments(self.dead_letter_exchange) or None
+            )
+            for routing_key in spec.routing_keys:
+                await queue.bind(exchange, routing_key)
+            
+            if spec.retry:
+                dead_letter_queue = await channel.declare_queue(spec.dead_letter_queue, durable=True)
+                await dead_letter_queue.bind(dead_letter_exchange, spec.name)
+                for delay_ms in set(spec.retry.delays_ms()):
+                    # Expired retries go back onto the work queue through the default exchange
+                    await channel.declare_queue(spec.retry_queue(delay_ms), durable=True, arguments={
+                        'x-message-ttl': delay_ms,
+                        'x-dead-letter-exchange': '',
+                        'x-dead-letter-routing-key': spec.name
+                    })
+        
+        return exchange
+
+# Shared topology of the order -> payment -> shipping pipeline
+DEFAULT_RETRY = RetryPolicy.from_env()
+
+ECOMMERCE_TOPOLOGY = Topology('ecommerce', [
+    QueueSpec.from_env('orders', ['order.*'], retry=DEFAULT_RETRY),
+    QueueSpec.from_env('payments', ['payment.*'], retry=DEFAULT_RETRY),
+    QueueSpec.from_env('shipping', ['shipping.*'], retry=DEFAULT_RETRY)
+], delivery_modes=delivery_modes_from_env())
+
+if os.getenv('EVENT_HISTORY_STREAM', 'false').lower() == 'true':
+    # Every event, kept for replay (e.g. rebuilding a projection from offset 'first')
+    ECOMMERCE_TOPOLOGY = ECOMMERCE_TOPOLOGY.with_queues(
+        QueueSpec.from_env('event-history', ['#'], queue_type='stream', max_age='7D')
+    )
\ No newline at end of file
@@ -0,0 +1,65 @@
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+CORRELATION_ID_HEADER = 'x-correlation-id'
+ORIGIN_TS_HEADER = 'x-origin-ts'
+PUBLISHED_AT_HEADER = 'x-published-at'
+HOPS_HEADER = 'x-trace-hops'
+
+class TraceContext:
+    """Correlation ID, origin time and hop history of one pipeline run.
+    
+    Travels in AMQP headers. Each hop is recorded as
+    "<service>/<queue>/<published_at>/<dequeued_at>" (epoch seconds).
+    """
+    
+    def __init__(self, correlation_id: str, origin_ts: float, hops: Optional[list[str]] = None):
+        self.correlation_id = correlation_id
+        self.origin_ts = origin_ts
+        self.hops = hops or []
+    
+    @classmethod
+    def start(cls) -> 'TraceContext':
+        """New trace for an event that doesn't follow from a consumed message"""
+        return cls(uuid.uuid4().hex, time.time())
+    
+    @classmethod
+    def from_headers(cls, headers: Optional[dict]) -> tuple[Optional['TraceContext'], Optional[float]]:
+        """Trace context and publish time of a consumed message, if present"""
+        headers = headers or {}
+        correlation_id = headers.get(CORRELATION_ID_HEADER)
+        if correlation_id is None:
+            return None, headers.get(PUBLISHED_AT_HEADER)
+        if isinstance(correlation_id, bytes):
+            correlation_id = correlation_id.decode()
+        hops = [hop.decode() if isinstance(hop, bytes) else hop for hop in headers.get(HOPS_HEADER) or []]
+        return cls(correlation_id, float(headers[ORIGIN_TS_HEADER]), hops), headers.get(PUBLISHED_AT_HEADER)
+    
+    def with_hop(self, service: str, queue: str, published_at: Optional[float], dequeued_at: float) -> 'TraceContext':
+        """Copy of this trace extended by the hop that just dequeued it"""
+        hop = f"{service}/{queue}/{published_at or 0:.6f}/{dequeued_at:.6f}"
+        return TraceContext(self.correlation_id, self.origin_ts, [*self.hops, hop])
+    
+    def to_headers(self, published_at: float) -> dict:
+        """AMQP headers for a message published now"""
+        return {
+            CORRELATION_ID_HEADER: self.correlation_id,
+            ORIGIN_TS_HEADER: self.origin_ts,
+            PUBLISHED_AT_HEADER: published_at,
+            HOPS_HEADER: self.hops
+        }
+
+# Trace of the message currently being handled; publishes inherit it
+current_trace: ContextVar[Optional[TraceContext]] = ContextVar('current_trace', default=None)
+
+# Traces of the events handed to a batch handler, by id() of the decoded event
+batch_traces: ContextVar[Optional[dict[int, TraceContext]]] = ContextVar('batch_traces', default=None)
+
+def trace_of(event: Optional[dict]) -> Optional[TraceContext]:
+    """Trace of an event from the batch being handled, if it came from one"""
+    traces = batch_traces.get()
+    if event is None or traces is None:
+        return None
+    return traces.get(id(event))
\ No newline at end of file